@@ -1,3 +1,30 @@
-from actions.build_player_list import *
-from actions.import_sync_file import *
-from actions.load_import_file import *
+import importlib
+
+# The names the package exports & the modules they live in; a module is only
+# imported the first time one of its names is used, so startup stays fast
+_exports = {
+    "NormalizeName": "build_player_list",
+    "HashPlayerRecords": "build_player_list",
+    "FindPlayerSlots": "build_player_list",
+    "BuildSlot": "build_player_list",
+    "BuildPlayerList": "build_player_list",
+    "WriteBatch": "import_sync_file",
+    "ImportSyncFile": "import_sync_file",
+    "IterJsonObjectItems": "load_import_file",
+    "LoadImportFile": "load_import_file",
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    module_name = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'actions' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"actions.{module_name}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,162 @@
+import hashlib
+import os
+
+import orjson
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import brotli  # noqa: F401 (lets urllib3 decode brotli responses)
+except ImportError:  # Only gzip & deflate are accepted then
+    brotli = None
+
+# The Dribble API export of every player
+API_URL = "https://drbl.live/players/api/export/"
+
+# Where API responses are cached between imports
+API_CACHE_DIR = "configs/cache"
+
+# The (connect, read) timeouts of API requests in seconds
+API_TIMEOUT = (10, 60)
+
+# Size of the chunks read from API responses
+API_CHUNK_SIZE = 0x10000
+
+# The session shared by every API request, so connections are reused
+_session = None
+
+
+def GetSession():
+    """
+    Get the pooled session used for API requests.
+
+    :return: The requests.Session instance.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=2)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session.headers["Accept-Encoding"] = (
+            "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+        )
+    return _session
+
+
+# A class to fetch API responses through an on-disk cache
+class ApiResponseCache(object):
+    """
+    An on-disk cache of API responses, revalidated with ETag / Last-Modified.
+
+    A response body is kept next to a small metadata file holding its
+    validators. An unchanged response costs a single 304 round trip and is
+    then read from disk.
+
+    :param cache_dir: The directory the responses are cached in.
+    :param session: The session to send requests with, the pooled one by default.
+    """
+
+    def __init__(self, cache_dir=API_CACHE_DIR, session=None):
+        self.cache_dir = cache_dir
+        self.session = session or GetSession()
+        self.last_status = None
+
+    def paths(self, url):
+        """
+        Get the cache paths of a URL.
+
+        :param url: The URL of the response.
+        :return: A tuple of (body path, metadata path).
+        """
+        key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+        base_path = os.path.join(self.cache_dir, key)
+        return f"{base_path}.body", f"{base_path}.meta.json"
+
+    def read_meta(self, url):
+        """
+        Get the validators of a cached response.
+
+        :param url: The URL of the response.
+        :return: The metadata dictionary, or None if nothing usable is cached.
+        """
+        body_path, meta_path = self.paths(url)
+        if not os.path.isfile(body_path):
+            return None
+        try:
+            with open(meta_path, "rb") as f:
+                return orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def read_body(self, body_path):
+        """Lazily yield the chunks of a cached body."""
+        with open(body_path, "rb") as f:
+            while True:
+                chunk = f.read(API_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_chunks(self, url):
+        """
+        Lazily yield the (decoded) body of a URL, from the cache if it's unchanged.
+
+        A changed body is streamed to the caller and written to the cache as it
+        arrives; it only replaces the cached one once it was read completely.
+
+        :param url: The URL to fetch.
+        :return: A generator of bytes chunks.
+        """
+        body_path, meta_path = self.paths(url)
+        meta = self.read_meta(url)
+
+        # Ask the server to only send the body if it changed
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self.session.get(
+            url, headers=headers, stream=True, timeout=API_TIMEOUT
+        ) as response:
+            self.last_status = response.status_code
+            if response.status_code == 304 and meta:
+                response.close()
+                yield from self.read_body(body_path)
+                return
+
+            response.raise_for_status()
+
+            # Stream the body to the caller while writing it to a temporary file
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{body_path}.part"
+            try:
+                with open(temp_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=API_CHUNK_SIZE):
+                        f.write(chunk)
+                        yield chunk
+            except BaseException:
+                # Don't leave a partial body behind (or cache it)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+        # Only cache responses that can be revalidated
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            os.replace(temp_path, body_path)
+            with open(meta_path, "wb") as f:
+                f.write(orjson.dumps({"etag": etag, "last_modified": last_modified}))
+        else:
+            os.remove(temp_path)
+            self.clear(url)
+
+    def clear(self, url):
+        """Drop the cached response of a URL."""
+        for path in self.paths(url):
+            if os.path.exists(path):
+                os.remove(path)
@@ -1,13 +1,157 @@
-import json
+import hashlib
+import threading
+import unicodedata
 from collections import defaultdict
 
 from dribble.memory import BuildPlayer
+from pymem.exception import MemoryReadError
 from rich.console import Console
 from rich.progress import Progress
 
+from actions.export_writer import EXPORT_FORMATS, StreamExport
+from actions.field_projection import FieldProjection
+from actions.instrumentation import Phase
+from actions.memory_snapshot import MemorySnapshot, ReadTablePointers, SnapshotGame
+from actions.offset_schema import GetSchema
+from actions.player_store import PlayerStore
+from actions.team_cache import TeamCache
+
 # Initialize the console for rich text output
 console = Console()
 
+# The most player slots read from the player table, the populated ones are found from there
+MAX_PLAYER_SLOTS = 30000
+
+# The number of empty slots in a row taken as the end of the player table. Players
+# are packed from the start of the table, so a gap this long is past its end; a
+# roster with longer gaps can pass a larger run to BuildPlayerList
+EMPTY_SLOT_RUN = 256
+
+# The user-mode address range a name pointer has to fall in
+MIN_POINTER = 0x10000
+MAX_POINTER = 0x7FFFFFFFFFFF
+
+# Memory is mapped in pages, so one read tells whether a whole page can be read
+PAGE_SIZE = 0x1000
+
+
+def NormalizeName(name):
+    """
+    Normalize a player name for lookups, folding case, whitespace and accents.
+
+    :param name: The player name.
+    :return: The normalized name.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def HashPlayerRecords(table, record_length):
+    """
+    Hash every player record of a raw player table.
+
+    :param table: The raw table bytes.
+    :param record_length: The length of a single record in bytes.
+    :return: A list of digests, one per table slot.
+    """
+    view = memoryview(table)
+    return [
+        hashlib.blake2b(view[start : start + record_length], digest_size=16).digest()
+        for start in range(0, len(view) - record_length + 1, record_length)
+    ]
+
+
+def FindPlayerSlots(table, record_length, pointer_offsets, start=0, empty_run=EMPTY_SLOT_RUN):
+    """
+    Find the populated slots of a raw player table from its name pointers.
+
+    Each pointer is read for every slot in one strided pass. A slot counts as
+    populated when a pointer is set and every set pointer is a user-mode
+    address. The table ends at the first run of empty_run slots that aren't
+    populated, so whatever follows the table isn't taken for players. Only
+    these slots need BuildPlayer.
+
+    :param table: The raw table bytes.
+    :param record_length: The length of a single record in bytes.
+    :param pointer_offsets: The offsets of the name pointers in a record.
+    :param start: The first slot to look at.
+    :param empty_run: The number of slots in a row that end the table.
+    :return: A list of the populated slots, in order.
+    """
+    pointers = [ReadTablePointers(table, record_length, offset) for offset in pointer_offsets]
+    slots = []
+    empty = 0
+    for slot, slot_pointers in enumerate(zip(*pointers)):
+        if slot < start:
+            continue
+        if any(slot_pointers) and all(
+            MIN_POINTER <= pointer <= MAX_POINTER for pointer in slot_pointers if pointer
+        ):
+            slots.append(slot)
+            empty = 0
+            continue
+
+        empty += 1
+        if empty >= empty_run:
+            break
+    return slots
+
+
+def ReadableSlots(memory, table, record_length, pointer_offsets, slots):
+    """
+    Keep the slots whose pointers lead to memory that can be read.
+
+    Whatever follows the player table can look like name pointers, but they
+    lead nowhere, so those slots hold no player. Each page the pointers lead
+    to is read once.
+
+    :param memory: The game memory reader instance.
+    :param table: The raw table bytes.
+    :param record_length: The length of a single record in bytes.
+    :param pointer_offsets: The offsets of the pointers BuildPlayer follows (names, team).
+    :param slots: The populated slots, from FindPlayerSlots.
+    :return: A list of the readable slots, in order.
+    """
+    pages = {}
+    readable = []
+    for slot in slots:
+        for offset in pointer_offsets:
+            start = slot * record_length + offset
+            pointer = int.from_bytes(table[start : start + 8], "little")
+            if not pointer:
+                continue
+            page = pointer // PAGE_SIZE
+            if page not in pages:
+                try:
+                    memory.read_bytes(pointer, 2)
+                    pages[page] = True
+                except MemoryReadError:
+                    pages[page] = False
+            if not pages[page]:
+                break
+        else:
+            readable.append(slot)
+    return readable
+
+
+def BuildSlot(game, slot):
+    """
+    Build the player of a table slot, a record whose names aren't text counts as empty.
+
+    Memory that can't be read isn't an empty slot, so those errors are raised;
+    slots whose pointers lead nowhere are left out by ReadableSlots.
+
+    :param game: The game (or SnapshotGame) to read the player through.
+    :param slot: The table slot.
+    :return: The player object, or None.
+    """
+    try:
+        return BuildPlayer(game, slot)
+    except UnicodeDecodeError:
+        # The name pointers point at something other than a name
+        return None
+
 
 # A class to export/build a list of players from the game memory
 class BuildPlayerList(object):
@@ -15,18 +159,32 @@ class BuildPlayerList(object):
     A class to export/build a list of players from the game memory.
 
     :param game: The game memory reader instance.
-    :param player_list_size: The number of players to export.
+    :param player_list_size: The most player slots to read, the populated ones are
+        detected from the table and the size is narrowed to the last of them.
+    :param empty_slot_run: The number of empty slots in a row taken as the end of the table.
     :param export: Whether to export the player list to a JSON file.
     :param singular: Whether to export a single player. Defaults to False.
     :return: None
     """
 
-    def __init__(self, game, player_list_size):
+    def __init__(self, game, player_list_size=MAX_PLAYER_SLOTS, empty_slot_run=EMPTY_SLOT_RUN):
         self.game = game
+        self.slot_limit = player_list_size
+        self.empty_slot_run = empty_slot_run
         self.player_list_size = player_list_size
         self.player_list = []
         self.player_dump = {}
+        self.store = PlayerStore()
         self.versions = {}
+        self.name_index = {}
+        self.dump_keys = {}
+        self.players_by_address = {}
+        self.table_address = None
+        self.slot_rows = {}
+        self.record_hashes = []
+        self.build_thread = None
+        self.build_error = None
+        self.team_cache = None
 
     def run(
         self,
@@ -34,18 +192,22 @@ class BuildPlayerList(object):
         singular=False,
         export_selections=None,
         only_include_addresses=None,
+        export_format="json",
+        quiet=False,
     ):
         # Print initial loading message
-        console.print("\n[yellow]Accessing player list...[/yellow]", justify="center")
+        if not quiet:
+            console.print("\n[yellow]Accessing player list...[/yellow]", justify="center")
 
         # Initialize list & dump variables
         player_list = []
         player_dump = {}
+        scanned_table = None
 
         # If we don't already have an initialized player list & dump, we need to create them
         if not self.player_list and not self.player_dump:
             # Start the progress bar & loading players
-            with Progress(transient=True) as progress:
+            with Phase("list_build"), Progress(transient=True, disable=quiet) as progress:
                 task = progress.add_task(
                     "[green]Loading players...",
                     total=self.player_list_size if not singular else 1,
@@ -54,15 +216,34 @@ class BuildPlayerList(object):
                 # Create list of players with their data from memory
                 player_list_start = 0 if not singular else self.player_list_size - 1
                 player_list = []
-                player_dump = {}
+                store = PlayerStore()
 
                 # Initialize dictionary to count player names
                 name_counts = defaultdict(int)
 
-                # Iterate through the player list size, create player objects, and add them to the player list & dump
-                for i in range(player_list_start, self.player_list_size):
-                    player = BuildPlayer(self.game, i)
+                # Drop the lookups built from any previous list
+                self.name_index = {}
+                self.dump_keys = {}
+                self.players_by_address = {}
+                self.versions = {}
+                self.table_address = None
+                self.slot_rows = {}
+                self.record_hashes = []
+
+                # Read players through a snapshot so the table is fetched in bulk instead of per field
+                snapshot_game = SnapshotGame(self.game) if not singular else self.game
+                schema = GetSchema()
+                record_length = schema.player_length
 
+                # Scan the populated slots, create player objects, and add them to the player list & dump
+                if singular:
+                    scan = (
+                        (i, BuildPlayer(snapshot_game, i))
+                        for i in range(player_list_start, self.player_list_size)
+                    )
+                else:
+                    scan = self.scan_slots(snapshot_game, progress, task)
+                for i, player in scan:
                     # Update progress bar
                     progress.update(task, advance=1)
 
@@ -78,24 +259,30 @@ class BuildPlayerList(object):
                         else:
                             unique_name = full_name
 
-                        # Store the player object in the player list
-                        player_list.append(player)
+                        # Add the player to the store
+                        row = store.append(unique_name, player)
 
-                        # Add the player data to the player dump
-                        player_dump[unique_name] = {
-                            "Address": player.address,
-                            "Team": player.team,
-                            "Vitals": player.vitals,
-                            "Attributes": player.attributes,
-                            "Badges": player.badges,
-                            "Tendencies": player.tendencies,
-                            "Hotzones": player.hotzones,
-                            "Signatures": player.signatures,
-                            "Accessories": player.accessories,
-                            "Gear": player.gear,
-                        }
+                        # Store a view of the player in the player list & index it
+                        player = store.view(row)
+                        player_list.append(player)
+                        self.slot_rows[i] = row
+                        self.index_player(player, full_name, unique_name)
                     else:
                         pass  # Skip if player is None
+
+                # Remember each record's hash so refresh() can spot the changed ones
+                if not singular:
+                    region = memoryview(snapshot_game.memory.region)[
+                        : self.player_list_size * record_length
+                    ]
+                    self.record_hashes = HashPlayerRecords(region, record_length)
+
+                    # An export decodes its selection from the table the scan just read
+                    if export and export_selections:
+                        scanned_table = region
+
+                self.store = store
+                player_dump = store
         else:
             # If player list & dump already exist, use them; filter if only_include_addresses is provided
             player_list = (
@@ -117,96 +304,513 @@ class BuildPlayerList(object):
                 }
             )
 
-        # Dump player_dump to a JSON file if export is True
+        # Stream player_dump to an export file if export is True
         if export:
-            # Check if the user wants to export specific selections
-            if export_selections:
-                filtered_dump = {
-                    player: {"Team": data["Team"]}
-                    for player, data in player_dump.items()
-                }
-
-                # Filter based on user selections
-                for player, data in player_dump.items():
-                    for category, items in data.items():
-                        if category in export_selections:
-                            selected_keys = export_selections.get(category, [])
-                            matching_items = {}
-
-                            # Filter the items based on user selections
-                            for item, value in items.items():
-                                if item in selected_keys:
-                                    matching_items[item] = value
-
-                            # Add matching items to the filtered dump
-                            if matching_items:
-                                filtered_dump[player] = filtered_dump.get(player, {})
-                                filtered_dump[player][category] = matching_items
-
-                player_dump = filtered_dump
-
-            # Remove the "Address" key from player_dump
-            for player, data in player_dump.items():
-                # Remove address from the player data
-                if "Address" in data:
-                    del data["Address"]
-
-            # Export player_dump to a JSON file
             export_name = input(
                 "\nEnter the name of the export file (without extension): "
             )
             export_dir = "configs/exports"
-            with open(f"{export_dir}/{export_name}.json", "w") as f:
-                json.dump(player_dump, f, indent=4)
-                f.close()
+            export_path = f"{export_dir}/{export_name}{EXPORT_FORMATS[export_format]}"
+            # A selection is pushed down, so only the selected fields are decoded
+            if export_selections:
+                players = self.project_players(
+                    export_selections, only_include_addresses, table=scanned_table
+                )
+            else:
+                players = player_dump.items()
+            player_count, bytes_written, seconds = StreamExport(
+                players, export_path, None, export_format
+            )
+            console.print(
+                f"\n[green]Exported {player_count} players to {export_path} "
+                f"({bytes_written / 1e6:.1f} MB at {bytes_written / 1e6 / max(seconds, 1e-9):.1f} MB/s).[/green]"
+            )
 
         # Return the player list & store it in the class instance
         self.player_list = player_list
         self.player_dump = player_dump
         return player_list
 
-    def find_versions(self):
-        if self.versions:  # If versions already found, return them
-            return self.versions
+    def scan_slots(self, snapshot_game, progress=None, task=None):
+        """
+        Yield the players of the populated slots of the player table.
 
-        if self.player_list:
-            seen = set()  # Sets have faster lookups than Lists
-            versions = {}
+        Slots are probed one by one until the first player gives the table
+        address, then the whole table is read at once and only the slots whose
+        name pointers are set are built. The list size is narrowed to the last
+        player, so it never has to be guessed.
 
-            for player in self.player_list:
-                player_name = (
-                    f"{player.vitals['First Name']} {player.vitals['Last Name']}"
-                )
-                player_team_key = player.team.get("Key", "Unknown")
-                player_address = hex(player.address).upper()
-
-                if player_name in seen:
-                    # Ensure versions entry exists
-                    version_entry = versions.setdefault(player_name, {})
-                    version_entry[f"{player_name} on {player_team_key}"] = (
-                        player_address
+        :param snapshot_game: The SnapshotGame to read players through.
+        :param progress: An optional Progress whose task total is corrected once the slots are known.
+        :param task: The task of the progress bar.
+        :return: A generator of (slot, player) pairs, player is None for empty slots.
+        """
+        schema = GetSchema()
+        record_length = schema.player_length
+        name_offsets = (schema.base["Offset First Name"], schema.base["Offset Last Name"])
+
+        for i in range(self.slot_limit):
+            player = BuildSlot(snapshot_game, i)
+            if player is None:
+                yield i, None
+                continue
+
+            # The first player gives the table address, so read the whole table at once
+            self.table_address = player.address - i * record_length
+            snapshot_game.memory.prefetch(
+                self.table_address,
+                self.slot_limit * record_length,
+                min_chunk_size=record_length,
+            )
+            slots = FindPlayerSlots(
+                snapshot_game.memory.region,
+                record_length,
+                name_offsets,
+                i + 1,
+                self.empty_slot_run,
+            )
+            slots = ReadableSlots(
+                snapshot_game.memory,
+                snapshot_game.memory.region,
+                record_length,
+                (*name_offsets, schema.base["Offset Player Team"]),
+                slots,
+            )
+            self.player_list_size = (slots[-1] if slots else i) + 1
+            if progress is not None:
+                progress.update(task, total=i + 1 + len(slots))
+
+            # Read every team once, players of the same team share one dictionary
+            self.team_cache = TeamCache(schema.team_length)
+            self.team_cache.load(
+                snapshot_game.memory,
+                snapshot_game.memory.region,
+                record_length,
+                schema.base["Offset Player Team"],
+            )
+            player.team = self.team_cache.share(i, player.team)
+
+            yield i, player
+            last_slot = i
+            for slot in slots:
+                player = BuildSlot(snapshot_game, slot)
+                if player is not None:
+                    player.team = self.team_cache.share(slot, player.team)
+                    last_slot = slot
+                yield slot, player
+
+            # Narrow the list size to the last slot that held a player
+            self.player_list_size = last_slot + 1
+            return
+
+        # No player was found in any slot
+        self.player_list_size = self.slot_limit
+
+    def project_players(self, export_selections, only_include_addresses=None, table=None):
+        """
+        Export the selected fields of every player in the list.
+
+        The selection is compiled into a FieldProjection. Its column fields are
+        decoded from the player table, the other selected items (and names &
+        teams) come from the player list, so each field reads the same as in a
+        regular export. A player whose record changed since the list read it
+        (or any player, when there's no table) is exported from the list alone,
+        so its values always belong to its name.
+
+        :param export_selections: A dictionary of category -> selected items.
+        :param only_include_addresses: Optional addresses of the players to include.
+        :param table: The raw player table the list was just built from, read fresh
+            from game when not given.
+        :return: A generator of (unique player name, player data) pairs in table order.
+        """
+        schema = GetSchema()
+        record_length = schema.player_length
+        projection = FieldProjection(schema, export_selections)
+
+        # Pick the players to export, in table order
+        slots = []
+        for slot, row in sorted(self.slot_rows.items()):
+            if only_include_addresses and self.store.addresses[row] not in only_include_addresses:
+                continue
+            slots.append(slot)
+
+        columns = {}
+        decoded_slots = []
+        if projection.fields and slots:
+            if table is None and self.table_address is not None:
+                with Phase("export_read"):
+                    memory = MemorySnapshot(self.game.memory)
+                    memory.prefetch(
+                        self.table_address,
+                        (slots[-1] + 1) * record_length,
+                        min_chunk_size=record_length,
                     )
-                else:
-                    # Store the first occurrence in versions
-                    seen.add(player_name)
-                    versions[player_name] = {
-                        f"{player_name} on {player_team_key}": player_address
+                    table = memory.region
+
+                # Only the records the list was read from decode to its players
+                record_hashes = HashPlayerRecords(table, record_length)
+                decoded_slots = [
+                    slot
+                    for slot in slots
+                    if slot < len(record_hashes)
+                    and slot < len(self.record_hashes)
+                    and record_hashes[slot] == self.record_hashes[slot]
+                ]
+            elif table is not None:
+                decoded_slots = slots
+
+            if decoded_slots:
+                with Phase("export_decode"):
+                    columns = projection.read(table, record_length, decoded_slots)
+        column_indexes = {slot: index for index, slot in enumerate(decoded_slots)}
+
+        for slot in slots:
+            view = self.store.view(self.slot_rows[slot])
+            index = column_indexes.get(slot)
+            data = {"Team": view.team}
+            for category in projection.categories:
+                if index is not None and category in columns:
+                    data[category] = {
+                        field_name: column[index]
+                        for field_name, column in columns[category].items()
                     }
+                    continue
+
+                # Keep a stored category only if any of its selected items matched
+                values = projection.stored_values(view, category)
+                if values or category in projection.fields:
+                    data[category] = values
+            yield view.name, data
+
+    def start_background(self):
+        """
+        Build the player list on a background thread, so prompts can open while it loads.
+
+        The build runs quietly; call wait() before using the list.
+
+        :return: None
+        """
+        self.build_error = None
+
+        def build():
+            try:
+                self.run(quiet=True)
+            except BaseException as e:
+                self.build_error = e
+
+        self.build_thread = threading.Thread(
+            target=build, name="player-list-build", daemon=True
+        )
+        self.build_thread.start()
+
+    def wait(self):
+        """
+        Wait for a background build to finish, raising any error it hit.
 
-            # Store and return versions
-            self.versions = versions
-            return versions
+        :return: None
+        """
+        if self.build_thread is None:
+            return
+        if self.build_thread.is_alive():
+            console.print("\n[yellow]Waiting for the player list...[/yellow]", justify="center")
+        self.build_thread.join()
+        self.build_thread = None
+
+        error, self.build_error = self.build_error, None
+        if error is not None:
+            raise error
+
+    def find_versions(self):
+        """
+        Get the versions of every player name, built as the players are indexed.
+
+        :return: A dictionary of "First Last" -> {"First Last on Key": address (uppercase hex)}.
+        """
+        # The versions are kept up to date by the scan & refresh, this only covers a list set by hand
+        if not self.versions and self.player_list:
+            self.rebuild_versions()
+        return self.versions
+
+    def rebuild_versions(self):
+        """
+        Build the versions again from the player list, in list order.
+
+        :return: None
+        """
+        self.versions = {}
+        for player in self.player_list:
+            self.add_version(
+                player, f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+            )
+
+    def add_version(self, player, full_name):
+        # A later player on the same team takes the label over, as it always has
+        player_team_key = player.team.get("Key", "Unknown")
+        self.versions.setdefault(full_name, {})[f"{full_name} on {player_team_key}"] = hex(
+            player.address
+        ).upper()
+
+    def player_at(self, address):
+        """
+        Get the player of the list at an address, without reading memory.
+
+        :param address: The address of the player, an integer or a hex string from find_versions.
+        :return: The player view, or None if no player of the list is there.
+        """
+        if isinstance(address, str):
+            address = int(address, 16)
+        return self.players_by_address.get(address)
 
     def find_player_by_name(self, name):
-        if self.player_list:
-            for player in self.player_list:
-                full_name = (
-                    f"{player.vitals['First Name']} {player.vitals['Last Name']}"
-                )
-                if full_name.lower() == name.lower():
-                    # Find the versions for the player (will include the first occurrence)
-                    player_versions = self.versions.get(full_name, {})
-                    return player, player_versions
+        """
+        Find a player by name using the name index.
+
+        :param name: The player name, optionally with a duplicate suffix like "(2)".
+        :return: The first matching player & its versions, or (None, None).
+        """
+        normalized_name = NormalizeName(name)
+        players = self.name_index.get(normalized_name)
+        if not players:
             return None, None
-        
-        return None, None
\ No newline at end of file
+
+        # A suffixed name like "(2)" points at exactly one version of the player
+        player = players[0]
+        full_name = f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+        if NormalizeName(full_name) != normalized_name:
+            return player, {}
+
+        # Find the versions for the player (will include the first occurrence)
+        return player, self.versions.get(full_name, {})
+
+    def find_player_data(self, address):
+        """
+        Find the player dump entry of a player by address.
+
+        :param address: The address of the player.
+        :return: The player's data by category, or None if it isn't in the dump.
+        """
+        dump_key = self.dump_keys.get(address)
+        if dump_key is None:
+            return None
+        return self.store.get(dump_key)
+
+    def fingerprint(self):
+        """
+        Fingerprint the player table: where it is, which player is at which
+        address & which team each player is on.
+
+        Values don't count, so the fingerprint stays the same across imports,
+        but a trade changes it, since versions are told apart by team.
+
+        :return: The hex digest of the player table.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(self.table_address).encode("utf-8"))
+        players = sorted(
+            (self.store.addresses[row], name, str(self.store.view(row).team.get("Key", "")))
+            for row, name in enumerate(self.store.names)
+            if name is not None
+        )
+        for address, name, team_key in players:
+            digest.update(b"\0%d\0" % address)
+            digest.update(name.encode("utf-8") + b"\0" + team_key.encode("utf-8"))
+        return digest.hexdigest()
+
+    def index_player(self, player, full_name, unique_name):
+        """
+        Add a player to the name & address lookups and to its name's versions.
+
+        :param player: The player view.
+        :param full_name: The player's "First Last" name.
+        :param unique_name: The player's name in the dump, suffixed for duplicates.
+        :return: None
+        """
+        self.name_index.setdefault(NormalizeName(full_name), []).append(player)
+        if unique_name != full_name:
+            self.name_index[NormalizeName(unique_name)] = [player]
+        self.dump_keys[player.address] = unique_name
+        self.players_by_address[player.address] = player
+        self.add_version(player, full_name)
+
+    def unindex_player(self, player):
+        """
+        Remove a player from the name & address lookups.
+
+        :param player: The player view.
+        :return: None
+        """
+        full_name = f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+        unique_name = self.dump_keys.pop(player.address, full_name)
+        registered = self.players_by_address.get(player.address)
+        if registered is not None and registered.row == player.row:
+            del self.players_by_address[player.address]
+
+        players = self.name_index.get(NormalizeName(full_name), [])
+        if player in players:
+            players.remove(player)
+        if not players:
+            self.name_index.pop(NormalizeName(full_name), None)
+        if unique_name != full_name:
+            self.name_index.pop(NormalizeName(unique_name), None)
+
+    def update_teams(self, snapshot_game, team_addresses):
+        """
+        Decode teams again & hand them to every player of the list on them.
+
+        :param snapshot_game: The SnapshotGame holding the current player table.
+        :param team_addresses: The addresses of the teams to decode.
+        :return: None
+        """
+        team_slots = {}
+        for slot in self.slot_rows:
+            team_address = self.team_cache.team_address(slot)
+            if team_address in team_addresses:
+                team_slots.setdefault(team_address, []).append(slot)
+
+        for slots in team_slots.values():
+            # Any player of the team reads the team record
+            player = BuildSlot(snapshot_game, slots[0])
+            if player is None:
+                continue
+            team = self.team_cache.share(slots[0], player.team)
+            for slot in slots:
+                self.store.set_team(self.slot_rows[slot], team)
+
+    def refresh(self):
+        """
+        Bring the player list up to date with game memory.
+
+        The player table is read in bulk and each record is hashed; only the
+        players whose record changed are read again. Teams are hashed too, a
+        changed team is decoded again for every player on it. Falls back to a full
+        rebuild when there's no list yet or the table has moved.
+
+        :return: A dictionary with the added, removed and changed player names.
+        """
+        # Let a background build finish first
+        self.wait()
+
+        report = {"added": [], "removed": [], "changed": []}
+        schema = GetSchema()
+        record_length = schema.player_length
+
+        # Check the table is still where it was by re-reading the first known player
+        snapshot_game = SnapshotGame(self.game)
+        first_slot = min(self.slot_rows) if self.slot_rows else None
+        if first_slot is not None and self.table_address is not None:
+            probe = BuildSlot(snapshot_game, first_slot)
+            table_moved = (
+                probe is None
+                or probe.address != self.table_address + first_slot * record_length
+            )
+        else:
+            table_moved = True
+
+        if table_moved:
+            self.player_list = []
+            self.player_dump = {}
+            self.run()
+            report["added"] = list(self.store)
+            return report
+
+        # Read the whole table & find where its populated slots end now
+        snapshot_game.memory.prefetch(
+            self.table_address, self.slot_limit * record_length, min_chunk_size=record_length
+        )
+        region = snapshot_game.memory.region
+        name_offsets = (schema.base["Offset First Name"], schema.base["Offset Last Name"])
+        slots = FindPlayerSlots(region, record_length, name_offsets, first_slot, self.empty_slot_run)
+        slots = ReadableSlots(
+            snapshot_game.memory,
+            region,
+            record_length,
+            (*name_offsets, schema.base["Offset Player Team"]),
+            slots,
+        )
+        populated = set(slots)
+        slot_count = max(self.player_list_size, (slots[-1] + 1) if slots else 0)
+        self.player_list_size = (slots[-1] + 1) if slots else 0
+
+        # Read the teams again & find the ones whose record changed (renamed, ...)
+        team_hashes = self.team_cache.record_hashes
+        self.team_cache.load(
+            snapshot_game.memory, region, record_length, schema.base["Offset Player Team"]
+        )
+        changed_teams = self.team_cache.changed_teams(team_hashes)
+
+        # Hash the records up to there, then compare record by record
+        record_hashes = HashPlayerRecords(
+            memoryview(region)[: slot_count * record_length], record_length
+        )
+        changed_slots = [
+            slot
+            for slot in range(slot_count)
+            if slot >= len(record_hashes)
+            or slot >= len(self.record_hashes)
+            or record_hashes[slot] != self.record_hashes[slot]
+        ]
+
+        removed_rows = set()
+        team_changed = False
+        for slot in changed_slots:
+            # Past the first player, only the populated slots hold players
+            player = (
+                BuildSlot(snapshot_game, slot)
+                if slot < first_slot or slot in populated
+                else None
+            )
+            if player is not None:
+                player.team = self.team_cache.share(slot, player.team)
+            row = self.slot_rows.get(slot)
+            view = self.store.view(row) if row is not None else None
+
+            # An unchanged name only needs the values updated
+            if view is not None and player is not None:
+                old_name = f"{view.vitals['First Name']} {view.vitals['Last Name']}"
+                new_name = f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+                if old_name == new_name:
+                    # A player traded to another team needs a new version label
+                    team_id = self.store.team_ids[row]
+                    self.store.update(row, player)
+                    team_changed = team_changed or self.store.team_ids[row] != team_id
+                    report["changed"].append(view.name)
+                    continue
+
+            # Otherwise drop the old player & add the new one
+            if view is not None:
+                report["removed"].append(view.name)
+                self.unindex_player(view)
+                self.store.remove(row)
+                removed_rows.add(row)
+                del self.slot_rows[slot]
+
+            if player is not None:
+                full_name = f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+                unique_name = full_name
+                duplicate_count = 1
+                while unique_name in self.store:
+                    duplicate_count += 1
+                    unique_name = f"{full_name} ({duplicate_count})"
+
+                row = self.store.append(unique_name, player)
+                view = self.store.view(row)
+                self.player_list.append(view)
+                self.slot_rows[slot] = row
+                self.index_player(view, full_name, unique_name)
+                report["added"].append(unique_name)
+
+        if removed_rows:
+            self.player_list = [
+                player for player in self.player_list if player.row not in removed_rows
+            ]
+
+        # Players of a changed team keep their record, so decode the team again for them
+        if changed_teams:
+            self.update_teams(snapshot_game, changed_teams)
+
+        # Names or teams changed, so build the versions again in list order
+        if report["added"] or report["removed"] or team_changed or changed_teams:
+            self.rebuild_versions()
+
+        self.record_hashes = record_hashes
+        return report
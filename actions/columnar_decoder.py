@@ -0,0 +1,159 @@
+from dribble.utils import ConvertToGameValue
+
+# The categories decoded column-wise from the player table. The player list is
+# built through BuildPlayer, which decodes every category itself and can't skip
+# any, so these columns serve player snapshots & projected exports instead
+COLUMN_CATEGORIES = ("Attributes", "Badges", "Tendencies", "Hotzones")
+
+# The ratings a byte-written field (attributes) can hold in game
+RATING_RANGE = range(25, 111)
+
+# Rating lookup tables, built once per field length
+_rating_tables = {}
+
+# numpy, imported on first use (False until tried, None if it isn't installed)
+_numpy = False
+
+
+def LoadNumpy():
+    """
+    Import numpy the first time columns are decoded, so startup doesn't pay for it.
+
+    :return: The numpy module, or None if it isn't installed.
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:  # Fall back to decoding row by row
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def GetRatingTable(length):
+    """
+    Build the raw value -> rating lookup table for byte-written fields.
+
+    The table is the inverse of ConvertToGameValue, so decoding always agrees
+    with the values the importer writes. Raw values that no rating produces
+    map to the closest rating below them.
+
+    :param length: The length of the field in bits.
+    :return: A list of ratings indexed by raw value.
+    """
+    table = _rating_tables.get(length)
+    if table is not None:
+        return table
+
+    table = [None] * (1 << length)
+    for rating in RATING_RANGE:
+        raw_value = int(ConvertToGameValue(rating, length))
+        if 0 <= raw_value < len(table) and table[raw_value] is None:
+            table[raw_value] = rating
+
+    # Fill the gaps with the closest known rating
+    previous = RATING_RANGE.start
+    for raw_value, rating in enumerate(table):
+        if rating is None:
+            table[raw_value] = previous
+        else:
+            previous = rating
+
+    _rating_tables[length] = table
+    return table
+
+
+def SelectColumnFields(schema, categories=COLUMN_CATEGORIES):
+    """
+    Get the fields of the given categories that live in the player record.
+
+    :param schema: The compiled OffsetSchema.
+    :param categories: The categories to select.
+    :return: A dictionary of category -> list of FieldDescriptors.
+    """
+    return {
+        category: [
+            field for field in schema.categories.get(category, []) if field.deref is None
+        ]
+        for category in categories
+    }
+
+
+def DecodeColumns(table, count, record_length, fields):
+    """
+    Decode fields of every record in a raw player table into columns.
+
+    :param table: The raw table bytes (bytes, bytearray, memoryview or mmap).
+    :param count: The number of records to decode.
+    :param record_length: The length of a single record in bytes.
+    :param fields: A dictionary of category -> list of FieldDescriptors.
+    :return: A dictionary of category -> {field name: column}, where a column
+        is a numpy array or a list of integers with one value per record.
+    """
+    numpy = LoadNumpy()
+    if numpy is None:
+        return _DecodeColumnsPython(table, count, record_length, fields)
+
+    records = numpy.frombuffer(table, dtype=numpy.uint8, count=count * record_length)
+    records = records.reshape(count, record_length)
+
+    # Combine the bytes of each distinct span once, little-endian, into a 64-bit word
+    words = {}
+    columns = {}
+    for category, category_fields in fields.items():
+        category_columns = {}
+        for field in category_fields:
+            key = (field.offset, field.span)
+            word = words.get(key)
+            if word is None:
+                word = numpy.zeros(count, dtype=numpy.uint64)
+                for index in range(field.span):
+                    byte = records[:, field.offset + index].astype(numpy.uint64)
+                    word |= byte << numpy.uint64(8 * index)
+                words[key] = word
+
+            column = (word >> numpy.uint64(field.start_bit)) & numpy.uint64(
+                (1 << field.length) - 1
+            )
+            if field.in_bytes:
+                column = numpy.asarray(GetRatingTable(field.length), dtype=numpy.int64)[
+                    column.astype(numpy.int64)
+                ]
+            else:
+                column = column.astype(numpy.int64)
+            category_columns[field.name] = column
+        columns[category] = category_columns
+
+    return columns
+
+
+def ColumnValues(column):
+    """
+    Get the values of a column as a list of Python integers.
+
+    :param column: A column returned by DecodeColumns.
+    :return: A list of integers.
+    """
+    numpy = LoadNumpy()
+    if numpy is not None and isinstance(column, numpy.ndarray):
+        return column.tolist()
+    return list(column)
+
+
+def _DecodeColumnsPython(table, count, record_length, fields):
+    """Decode columns with plain Python when numpy isn't available."""
+    columns = {}
+    for category, category_fields in fields.items():
+        category_columns = {}
+        for field in category_fields:
+            column = [
+                field.extract(table, index * record_length) for index in range(count)
+            ]
+            if field.in_bytes:
+                ratings = GetRatingTable(field.length)
+                column = [ratings[value] for value in column]
+            category_columns[field.name] = column
+        columns[category] = category_columns
+
+    return columns
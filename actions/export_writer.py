@@ -0,0 +1,85 @@
+import time
+
+import orjson
+
+# The export formats & their file extensions
+EXPORT_FORMATS = {
+    "json": ".json",
+    "jsonl": ".jsonl",
+}
+
+
+def ExportPlayerData(data, export_selections=None):
+    """
+    Build the export entry of one player without touching the cached data.
+
+    :param data: The player's data (a PlayerView or a player dump entry).
+    :param export_selections: Optional dictionary of category -> selected items.
+    :return: A dictionary of category -> values, without the player's address.
+    """
+    entry = {"Team": data["Team"]}
+
+    for category in data.keys():
+        if category in ("Address", "Team"):
+            continue
+
+        items = data[category]
+        if export_selections is None:
+            entry[category] = dict(items)
+        elif category in export_selections:
+            # Keep only the selected items, and the category only if any matched
+            selected_keys = set(export_selections.get(category, []))
+            matching_items = {
+                item: value for item, value in items.items() if item in selected_keys
+            }
+            if matching_items:
+                entry[category] = matching_items
+
+    return entry
+
+
+def StreamExport(players, file_path, export_selections=None, export_format="json"):
+    """
+    Write players to an export file one at a time.
+
+    "json" writes the same object as a regular export (player name -> data),
+    "jsonl" writes one {player name: data} object per line for machine consumers.
+
+    :param players: An iterable of (player name, player data) pairs.
+    :param file_path: The path of the export file.
+    :param export_selections: Optional dictionary of category -> selected items.
+    :param export_format: The export format, "json" or "jsonl".
+    :return: A tuple of (players written, bytes written, seconds taken).
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}.")
+
+    start_time = time.perf_counter()
+    player_count = 0
+    bytes_written = 0
+
+    with open(file_path, "wb") as f:
+        if export_format == "json":
+            bytes_written += f.write(b"{")
+
+        for name, data in players:
+            entry = ExportPlayerData(data, export_selections)
+
+            if export_format == "json":
+                # Indent the player's object one level to sit inside the top-level object
+                body = orjson.dumps(entry, option=orjson.OPT_INDENT_2)
+                chunk = b"%s\n  %s: %s" % (
+                    b"," if player_count else b"",
+                    orjson.dumps(name),
+                    body.replace(b"\n", b"\n  "),
+                )
+            else:
+                chunk = orjson.dumps({name: entry}) + b"\n"
+
+            bytes_written += f.write(chunk)
+            player_count += 1
+
+        if export_format == "json":
+            bytes_written += f.write(b"\n}\n" if player_count else b"}\n")
+
+    return player_count, bytes_written, time.perf_counter() - start_time
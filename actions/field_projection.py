@@ -0,0 +1,103 @@
+from actions.columnar_decoder import (
+    COLUMN_CATEGORIES,
+    ColumnValues,
+    DecodeColumns,
+    SelectColumnFields,
+)
+from actions.player_store import STORE_CATEGORIES
+
+
+# A class to compile an export selection into the fields that have to be read
+class FieldProjection(object):
+    """
+    The fields an export selection needs, split by where their values come from.
+
+    Only the categories a regular export holds are projected. Fields of the
+    column categories decode the same column-wise as through BuildPlayer, so
+    they are decoded from the bulk-read table. The other categories (Vitals,
+    Signatures, ...) are decoded by BuildPlayer into names & strings, so their
+    selected items are taken from the player list.
+
+    :param schema: The compiled OffsetSchema.
+    :param export_selections: Optional dictionary of category -> selected items,
+        None selects every field.
+    """
+
+    def __init__(self, schema, export_selections=None):
+        self.fields = {}
+        self.stored = {}
+
+        column_fields = SelectColumnFields(schema)
+        for category in STORE_CATEGORIES:
+            selected = None
+            if export_selections is not None:
+                if category not in export_selections:
+                    continue
+                selected = set(export_selections.get(category) or ())
+
+            if category in COLUMN_CATEGORIES:
+                fields = [
+                    field
+                    for field in column_fields[category]
+                    if selected is None or field.name in selected
+                ]
+                if fields:
+                    self.fields[category] = fields
+            else:
+                self.stored[category] = selected
+
+    def __bool__(self):
+        return bool(self.fields or self.stored)
+
+    @property
+    def categories(self):
+        # The projected categories, in the order of a regular export
+        return [
+            category
+            for category in STORE_CATEGORIES
+            if category in self.fields or category in self.stored
+        ]
+
+    def read(self, table, record_length, slots):
+        """
+        Decode the selected column fields of table slots.
+
+        :param table: The raw player table bytes.
+        :param record_length: The length of a player record in bytes.
+        :param slots: The table slots to decode.
+        :return: A dictionary of category -> {field name: list of values}, one value per slot.
+        """
+        slots = list(slots)
+        columns = {}
+        if not self.fields:
+            return columns
+
+        # Decode the whole table column-wise, then keep the wanted slots
+        decoded = DecodeColumns(table, len(table) // record_length, record_length, self.fields)
+        for category, category_columns in decoded.items():
+            columns[category] = {}
+            for field_name, column in category_columns.items():
+                values = ColumnValues(column)
+                columns[category][field_name] = [values[slot] for slot in slots]
+        return columns
+
+    def stored_values(self, view, category):
+        """
+        Get the selected items of a category the player list holds.
+
+        A column category is read from the list too, for players whose
+        record can't be decoded from the table.
+
+        :param view: The PlayerView of the player.
+        :param category: The category.
+        :return: A dictionary of item -> value, in the order of a regular export.
+        """
+        if category in self.fields:
+            selected = {field.name for field in self.fields[category]}
+        else:
+            selected = self.stored[category]
+        return {
+            item: value
+            for item, value in view[category].items()
+            if selected is None or item in selected
+        }
@@ -0,0 +1,255 @@
+import glob
+import hashlib
+import os
+import struct
+
+import orjson
+
+from actions.offset_schema import OFFSETS_FILE
+from actions.write_coalescer import ShadowRecord
+
+# Where compiled import plans are cached
+PLAN_DIR = "configs/plans"
+
+# The plan file header: magic, format version, record count & pointer guard count
+PLAN_MAGIC = b"DRPL"
+PLAN_VERSION = 1
+PLAN_HEADER = struct.Struct("<4sBII")
+
+# A write record: address, mask, value (already shifted into the mask), byte span & category
+PLAN_RECORD = struct.Struct("<QQQBH")
+
+# A pointer guard: pointer address & the sub-record address it held when compiled
+PLAN_GUARD = struct.Struct("<QQ")
+
+
+def HashFile(file_path):
+    """
+    Hash the contents of a file.
+
+    :param file_path: The path of the file.
+    :return: The hex digest of the file.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(0x10000), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def PlanPath(import_file_path, table_fingerprint, policy):
+    """
+    Get the cache path of the plan compiled from an import file.
+
+    The key covers the import file, the offsets file, the player table and the
+    version policy, so a change to any of them points at a different plan.
+
+    :param import_file_path: The path of the import file.
+    :param table_fingerprint: The fingerprint of the player table.
+    :param policy: The version selection policy the plan was compiled with.
+    :return: The path of the plan file.
+    """
+    key = hashlib.blake2b(digest_size=16)
+    for part in (
+        HashFile(import_file_path),
+        HashFile(OFFSETS_FILE),
+        table_fingerprint,
+        policy,
+    ):
+        key.update(part.encode("utf-8") + b"\0")
+
+    stem = os.path.splitext(os.path.basename(import_file_path))[0]
+    return os.path.join(PLAN_DIR, f"{stem}.{key.hexdigest()}.plan")
+
+
+# A class to hold the raw writes an import file compiles to
+class ImportPlan(object):
+    """
+    A compiled import: every write as an (address, span, mask, value) record.
+
+    Sub-record addresses are baked into the records, so the pointers they were
+    resolved from are kept as guards and checked before a replay.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.guards = {}
+        self.categories = []
+        self.logs = []
+        self.failed = {}
+
+    def add(self, address, field, value):
+        """
+        Add a raw field value written at an address.
+
+        :param address: The address of the field.
+        :param field: The FieldDescriptor of the field.
+        :param value: The raw integer value.
+        :return: None
+        """
+        if field.category not in self.categories:
+            self.categories.append(field.category)
+        self.records.append(
+            (
+                address,
+                field.mask,
+                (int(value) << field.start_bit) & field.mask,
+                field.span,
+                self.categories.index(field.category),
+            )
+        )
+
+    def guard(self, pointer_address, sub_record_address):
+        """
+        Keep the sub-record address a pointer held when the plan was compiled.
+
+        :param pointer_address: The address of the pointer.
+        :param sub_record_address: The address it pointed at.
+        :return: None
+        """
+        self.guards[pointer_address] = sub_record_address
+
+    def is_current(self, memory):
+        """
+        Check every sub-record pointer still points where it did.
+
+        :param memory: The game memory reader instance.
+        :return: True if the plan can be replayed.
+        """
+        for pointer_address, sub_record_address in self.guards.items():
+            pointer = int.from_bytes(memory.read_bytes(pointer_address, 8), "little")
+            if pointer != sub_record_address:
+                return False
+        return True
+
+    def replay(self, memory, counts, region_gap, mismatches=None):
+        """
+        Write every record to memory.
+
+        Records are sorted and grouped into regions, each read once, merged
+        locally and written back as changed byte ranges.
+
+        :param memory: The game memory reader instance.
+        :param counts: The written & skipped counts per category to update.
+        :param region_gap: The largest gap between records read as one region.
+        :param mismatches: An optional list to verify the writes into; each region is
+            read back once and (address, category, written, read) tuples are added
+            for the records that don't hold their value.
+        :return: The number of writes made.
+        """
+        # A stable sort keeps later writes to the same address last
+        records = sorted(self.records, key=lambda record: record[0])
+        writes = 0
+        start = 0
+        while start < len(records):
+            # Extend the region while the next record is close enough
+            end = start + 1
+            region_end = records[start][0] + records[start][3]
+            while end < len(records) and records[end][0] - region_end <= region_gap:
+                region_end = max(region_end, records[end][0] + records[end][3])
+                end += 1
+
+            region_address = records[start][0]
+            region = ShadowRecord(memory, region_address, region_end - region_address)
+            for address, mask, value, span, category_index in records[start:end]:
+                category = self.categories[category_index]
+                if region.merge(address - region_address, span, mask, value):
+                    counts[category]["written"] += 1
+                else:
+                    counts[category]["skipped"] += 1
+
+            writes += region.flush()
+
+            # Read the region back & check every record holds what was merged last
+            if mismatches is not None:
+                data = region.read_back()
+                for address, mask, value, span, category_index in records[start:end]:
+                    offset = address - region_address
+                    shift = (mask & -mask).bit_length() - 1
+                    expected = int.from_bytes(region.record[offset : offset + span], "little")
+                    actual = int.from_bytes(data[offset : offset + span], "little")
+                    if (expected ^ actual) & mask:
+                        mismatches.append(
+                            (
+                                address,
+                                self.categories[category_index],
+                                (expected & mask) >> shift,
+                                (actual & mask) >> shift,
+                            )
+                        )
+            start = end
+
+        return writes
+
+    def save(self, file_path):
+        """
+        Save the plan, replacing older plans of the same import file.
+
+        :param file_path: The path from PlanPath.
+        :return: None
+        """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        stem = os.path.basename(file_path).rsplit(".", 2)[0]
+        old_paths = glob.glob(
+            os.path.join(glob.escape(PLAN_DIR), f"{glob.escape(stem)}.*.plan")
+        )
+        for old_path in old_paths:
+            if os.path.abspath(old_path) != os.path.abspath(file_path):
+                os.remove(old_path)
+
+        with open(file_path, "wb") as f:
+            f.write(
+                PLAN_HEADER.pack(
+                    PLAN_MAGIC, PLAN_VERSION, len(self.records), len(self.guards)
+                )
+            )
+            f.write(b"".join(PLAN_RECORD.pack(*record) for record in self.records))
+            f.write(b"".join(PLAN_GUARD.pack(*guard) for guard in self.guards.items()))
+            trailer = {
+                "categories": self.categories,
+                "logs": self.logs,
+                "failed": self.failed,
+            }
+            f.write(orjson.dumps(trailer))
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load a cached plan.
+
+        :param file_path: The path from PlanPath.
+        :return: The ImportPlan, or None if there's no usable plan.
+        """
+        try:
+            with open(file_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        try:
+            magic, version, record_count, guard_count = PLAN_HEADER.unpack_from(data)
+            if magic != PLAN_MAGIC or version != PLAN_VERSION:
+                return None
+
+            plan = cls()
+            position = PLAN_HEADER.size
+            plan.records = [
+                PLAN_RECORD.unpack_from(data, position + index * PLAN_RECORD.size)
+                for index in range(record_count)
+            ]
+            position += record_count * PLAN_RECORD.size
+            for index in range(guard_count):
+                pointer_address, sub_record_address = PLAN_GUARD.unpack_from(
+                    data, position + index * PLAN_GUARD.size
+                )
+                plan.guards[pointer_address] = sub_record_address
+            position += guard_count * PLAN_GUARD.size
+
+            trailer = orjson.loads(data[position:])
+            plan.categories = trailer["categories"]
+            plan.logs = trailer["logs"]
+            plan.failed = trailer["failed"]
+        except (struct.error, orjson.JSONDecodeError, KeyError, TypeError):
+            return None
+
+        return plan
@@ -1,46 +1,39 @@
-from dribble.memory import (
-    BuildPlayer,
-    GetOffset,
-    WriteBinaryBytes,
-    WriteInteger,
-    written_in_bytes,
-    written_in_integers,
-)
+import queue
+import threading
+from collections import defaultdict
+from itertools import groupby
+
+from dribble.memory import written_in_bytes, written_in_integers
 from dribble.models import GetCodeFromString
 from dribble.utils import ConvertToGameValue
 from rich import print
 
-def ResolveWriteAddress(game, player, offset_info):
-	# --- normalize offset ---
-	raw_offset = offset_info.get("offset")
-	if raw_offset is None:
-		raise ValueError("offset_info missing required 'offset'")
-
-	try:
-		offset = int(raw_offset, 0) if isinstance(raw_offset, str) else int(raw_offset)
-	except Exception:
-		raise TypeError(f"Invalid offset value: {raw_offset}")
+from actions.import_plan import ImportPlan, PlanPath
+from actions.instrumentation import GetInstrumentation, Phase
+from actions.offset_schema import GetSchema
+from actions.write_coalescer import PlayerWriteTransaction
 
-	# --- normalize derefAddress (optional) ---
-	raw_deref = offset_info.get("derefAddress")
-	if raw_deref is None:
-		return player.address + offset
+# The number of players planned ahead of the writer
+IMPORT_QUEUE_SIZE = 64
 
-	try:
-		deref = int(raw_deref, 0) if isinstance(raw_deref, str) else int(raw_deref)
-	except Exception:
-		raise TypeError(f"Invalid derefAddress value: {raw_deref}")
 
-	# --- dereference using pymem-style read ---
-	ptr_address = player.address + deref
-
-	ptr_bytes = game.memory.read_bytes(ptr_address, 8)
-	sub_ptr = int.from_bytes(ptr_bytes, byteorder="little")
+# A class to carry one import entry from the planning stage to the writer
+class WriteBatch(object):
+    """
+    The players an import entry resolved to, their raw values and whatever the
+    planning stage logged & counted for them. The values are converted once,
+    but what failed to convert is logged & counted for every player, like the
+    values that are written.
+    """
 
-	if not sub_ptr:
-		raise ValueError(f"Null pointer at derefAddress {hex(deref)}")
+    __slots__ = ("players", "values", "logs", "value_logs", "counts")
 
-	return sub_ptr + offset
+    def __init__(self):
+        self.players = []
+        self.values = None
+        self.logs = []
+        self.value_logs = []
+        self.counts = defaultdict(lambda: {"written": 0, "skipped": 0, "failed": 0})
 
 
 # A class to handle the import of a sync file to game memory
@@ -49,141 +42,528 @@ class ImportSyncFile(object):
     Import a sync file.
     """
 
-    def __init__(self, game, exporter, json_file):
+    def __init__(
+        self,
+        game,
+        exporter,
+        json_file,
+        skip_unchanged=False,
+        source_path=None,
+        import_all_versions=None,
+        version_policy=None,
+        verify=False,
+        source_logs=None,
+    ):
         """
         Initialize the ImportSyncFile class.
 
         :param game: The game object.
         :param exporter: The exporter object that holds the player list.
-        :param json_file: The JSON file containing the import data.
+        :param json_file: The import data, a dictionary or an iterable of (player name, data) pairs.
+        :param skip_unchanged: Whether to skip values the player list already holds.
+        :param source_path: The path of the import file, used to cache its compiled plan.
+        :param import_all_versions: Whether to write to every version of a player, prompted for if None.
+        :param version_policy: An optional VersionPolicy choosing versions instead of any prompt.
+        :param verify: Whether to read each player back after its writes and log values that didn't stick.
+        :param source_logs: Optional lines saying where the values came from (a merged import),
+            written to the end of the log.
         :return: None
         """
         self.game = game
         self.exporter = exporter
         self.json_file = json_file
+        self.skip_unchanged = skip_unchanged
+        self.source_path = source_path
+        self.import_all_versions = import_all_versions
+        self.version_policy = version_policy
+        self.verify = verify
+        self.source_logs = source_logs or []
+
+        # Initialize lists to store logs and players not found
+        self.logs = []
+        self.players_not_found = []
+
+        # Count written, skipped & failed values per category
+        self.counts = defaultdict(lambda: {"written": 0, "skipped": 0, "failed": 0})
+
+        # Count the values read back, the ones memory didn't hold & the ones that
+        # couldn't be read back, logged apart from the import logs so a cached plan doesn't carry them
+        self.verify_counts = {"checked": 0, "mismatched": 0, "unreadable": 0}
+        self.verify_logs = []
+
+        # The error that stopped the import, if any
+        self.error = None
+
+        # Get the compiled offsets, shared by every field lookup
+        self.schema = GetSchema()
+
+        # The plan the import is compiled into, when it can be cached
+        self.plan = None
+
+    def select_players(self, name, import_all_versions, prompt_versions):
+        """
+        Find the player(s) an import entry is written to.
+
+        :param name: The player name from the import file.
+        :param import_all_versions: Whether to use every version of the player.
+        :param prompt_versions: The prompt used to pick versions otherwise.
+        :return: A list of players, holding None if the player wasn't found.
+        """
+        # Check if the player is in the player list
+        with Phase("find_versions"):
+            self.exporter.find_versions()
+        with Phase("resolve_names"):
+            first_version, versions = self.exporter.find_player_by_name(name)
+        selected_players = []
+        selected_player_objects = []
+
+        # Prompt user to select which versions(s) to use
+        if versions and len(versions) > 1:
+            if import_all_versions:
+                selected_players = [versions[version] for version in versions]
+            elif self.version_policy is not None:
+                selected_players = self.version_policy.select(name, versions)
+            else:
+                selected_players = prompt_versions(versions)
+
+            # Take the selected players from the player list, no need to read them again
+            with Phase("resolve_versions"):
+                for player_address in selected_players:
+                    player = self.exporter.player_at(player_address)
+                    if player:
+                        selected_player_objects.append(player)
+        else:
+            # Only the first version is available, so add it to the list
+            selected_player_objects.append(first_version)
+
+        return selected_player_objects
+
+    def convert_values(self, data, logs=None, counts=None):
+        """
+        Convert the import values of a player to the raw values stored in game.
+
+        :param data: The player's import data by category.
+        :param logs: The list errors are logged to, the import's logs by default.
+        :param counts: The counts failures are added to, the import's counts by default.
+        :return: A list of (field, raw value, import value) tuples.
+        """
+        logs = self.logs if logs is None else logs
+        counts = self.counts if counts is None else counts
+        values = []
+
+        # Iterate through the categories that are written in bytes (only attributes)
+        for category in written_in_bytes:
+            if category in data:
+                try:
+                    for item, new_value in data[category].items():
+                        # Get the offset information for the category
+                        field = self.schema.field(category, item)
+                        if not field:
+                            counts[category]["failed"] += 1
+                            logs.append(
+                                f"Information for {item} not found in {category} offsets."
+                            )
+                            continue
+
+                        # Convert the rating to the value stored in game
+                        new_game_value = ConvertToGameValue(new_value, field.length)
+                        values.append((field, new_game_value, new_value))
+
+                except Exception as e:
+                    counts[category]["failed"] += 1
+                    logs.append(f"Error writing {new_value} to {item}: {e}")
+
+        # Iterate through the categories that are written in integers (everything else)
+        for category in written_in_integers:
+            if category in data:
+                try:
+                    for item, new_value in data[category].items():
+                        field = self.schema.field(category, item)
+                        if not field:
+                            counts[category]["failed"] += 1
+                            logs.append(f"Information for {item} not found in {category} offsets.")
+                            continue
+
+                        if isinstance(new_value, str):
+                            new_game_value = GetCodeFromString(item, new_value)
+                            if new_game_value is None:
+                                counts[category]["failed"] += 1
+                                logs.append(f"Invalid string representation for {item}: {new_value}")
+                                continue
+                        else:
+                            new_game_value = new_value
+
+                        values.append((field, new_game_value, new_value))
+
+                except Exception as e:
+                    counts[category]["failed"] += 1
+                    logs.append(f"Error writing {new_value} to {item}: {e}")
+
+        return values
+
+    def write_player(self, player, values):
+        """
+        Stage the raw values of a player and write the changed bytes to memory.
+
+        :param player: The player object.
+        :param values: A list of (field, raw value, import value) tuples.
+        :return: None
+        """
+        # Stage every change to the player locally, then write them together
+        transaction = PlayerWriteTransaction(self.game, player, self.schema)
+        staged = []
+
+        # Get the values the player list holds for the player, to skip unchanged ones
+        current_data = (
+            self.exporter.find_player_data(player.address)
+            if self.skip_unchanged
+            else None
+        ) or {}
+
+        # Stage the values category by category, each timed as its own phase
+        for category, category_values in groupby(values, key=lambda value: value[0].category):
+            with Phase("stage", category):
+                for field, new_game_value, new_value in category_values:
+                    self.stage_value(
+                        transaction, current_data, staged, field, new_game_value, new_value
+                    )
+
+        # Keep the pointers the planned sub-record addresses came from, checked before a replay
+        if self.plan is not None:
+            for pointer_address, address in transaction.pointers.items():
+                self.plan.guard(pointer_address, address)
+
+        # Write the changed byte ranges of the player to memory
+        try:
+            with Phase("write"):
+                transaction.flush()
+        except Exception as e:
+            self.plan = None
+            for field, value in staged:
+                self.counts[field.category]["failed"] += 1
+            self.logs.append(f"Error writing changes for {hex(player.address).upper()}: {e}")
+            return
+
+        # Read the player back to check the values stuck, one read per record
+        if self.verify and staged:
+            with Phase("verify"):
+                self.verify_player(player, transaction)
+
+        # Count the written values & keep the player list in step with memory
+        for field, value in staged:
+            self.counts[field.category]["written"] += 1
+            current_values = current_data.get(field.category)
+            if current_values is not None and field.name in current_values:
+                current_values[field.name] = value
+
+    def stage_value(self, transaction, current_data, staged, field, new_game_value, new_value):
+        """
+        Stage one value of a player, unless the player already holds it.
+
+        :param transaction: The player's PlayerWriteTransaction.
+        :param current_data: The values the player list holds for the player.
+        :param staged: The list of staged (field, value) pairs to add to.
+        :param field: The FieldDescriptor of the value.
+        :param new_game_value: The raw value.
+        :param new_value: The value from the import file.
+        :return: None
+        """
+        category = field.category
+        try:
+            # Every value goes in the plan, whether or not it's skipped now
+            if self.plan is not None:
+                record = transaction.record_for(field.deref)
+                self.plan.add(record.address + field.offset, field, new_game_value)
+
+            # Skip the value if the player already holds it (as a string or a code),
+            # checking memory itself for fields the player list doesn't hold
+            current_values = current_data.get(category)
+            current_value = current_values.get(field.name) if current_values else None
+            if current_value is not None:
+                if field.in_bytes:
+                    unchanged = current_value == new_value
+                else:
+                    unchanged = current_value in (new_value, new_game_value)
+            else:
+                unchanged = self.skip_unchanged and transaction.holds(field, new_game_value)
+            if unchanged:
+                self.counts[category]["skipped"] += 1
+                return
+
+            transaction.stage(field, new_game_value)
+            staged.append(
+                (
+                    field,
+                    new_value
+                    if field.in_bytes or isinstance(current_value, str)
+                    else new_game_value,
+                )
+            )
+
+        except Exception as e:
+            # A plan missing a value can't be replayed
+            self.plan = None
+            self.counts[category]["failed"] += 1
+            self.logs.append(f"Error writing {new_value} to {field.name}: {e}")
+
+    def verify_player(self, player, transaction):
+        """
+        Check a player's flushed values against memory, logging the mismatches.
+
+        :param player: The player object.
+        :param transaction: The flushed PlayerWriteTransaction of the player.
+        :return: The number of values that didn't read back as written, or couldn't be read back.
+        """
+        try:
+            mismatches = transaction.verify()
+        except Exception as e:
+            # Values that can't be read back aren't known to have stuck
+            self.verify_counts["unreadable"] += len(transaction.staged)
+            self.verify_logs.append(f"Error verifying {hex(player.address).upper()}: {e}")
+            return len(transaction.staged)
+
+        self.verify_counts["checked"] += len(transaction.staged)
+        self.verify_counts["mismatched"] += len(mismatches)
+        for field, expected, actual in mismatches:
+            self.verify_logs.append(
+                f"Verify mismatch for {hex(player.address).upper()} {field.category} "
+                f"{field.name}: wrote {expected}, read back {actual} (raw)"
+            )
+        return len(mismatches)
+
+    def write_batches(self, batches, errors):
+        """
+        Write planned batches to memory until the planning stage is done.
+
+        Runs on the writer thread. Batches are written in the order they were
+        planned, so the logs & counts come out the same as a one-thread import.
+
+        :param batches: The queue of WriteBatches, ending with None.
+        :param errors: A list an unexpected error is added to.
+        :return: None
+        """
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+
+            # Keep draining after an error so the planning stage never blocks
+            if errors:
+                continue
+
+            try:
+                self.logs.extend(batch.logs)
+                for player in batch.players:
+                    # Values that failed to convert fail for every version, once each
+                    self.logs.extend(batch.value_logs)
+                    for category, count in batch.counts.items():
+                        for outcome, value in count.items():
+                            self.counts[category][outcome] += value
+
+                    self.write_player(player, batch.values)
+            except Exception as e:
+                errors.append(e)
+
+    @property
+    def succeeded(self):
+        # Whether every value was written (& read back as written) with no error along the way
+        return (
+            self.error is None
+            and not any(count["failed"] for count in self.counts.values())
+            and not self.verify_counts["mismatched"]
+            and not self.verify_counts["unreadable"]
+        )
+
+    def write_log(self):
+        """
+        Write the logs & counts of the import to the log file.
+
+        :return: The path of the log file.
+        """
+        log_file_path = "configs/logs/import_log.txt"
+        with Phase("log_flush"), open(log_file_path, "w") as log_file:
+            if len(self.logs) > 0 or len(self.verify_logs) > 0:
+                for log in self.logs + self.verify_logs:
+                    log_file.write(log + "\n")
+            else:
+                log_file.write("No errors found.\n")
+            if self.error is not None:
+                log_file.write(f"Import stopped by an error: {self.error}\n")
+            for category, count in self.counts.items():
+                log_file.write(
+                    f"{category}: {count['written']} written, {count['skipped']} skipped, {count['failed']} failed.\n"
+                )
+            if self.verify:
+                log_file.write(
+                    f"Verify: {self.verify_counts['checked']} values read back, "
+                    f"{self.verify_counts['mismatched']} mismatched, "
+                    f"{self.verify_counts['unreadable']} couldn't be read back.\n"
+                )
+            if self.source_logs:
+                log_file.write("Value sources:\n")
+                for log in self.source_logs:
+                    log_file.write(log + "\n")
+
+        # Write the metrics report next to the log if instrumentation is on
+        instrumentation = GetInstrumentation()
+        if instrumentation is not None:
+            for category, count in self.counts.items():
+                for outcome, value in count.items():
+                    instrumentation.count(f"values_{outcome}", category, value)
+            if self.verify:
+                instrumentation.count("values_verified", None, self.verify_counts["checked"])
+                instrumentation.count("values_mismatched", None, self.verify_counts["mismatched"])
+                instrumentation.count("values_unreadable", None, self.verify_counts["unreadable"])
+            instrumentation.write_reports()
+
+        return log_file_path
 
     def run(self):
         """
         Run the import process.
 
-        :return: None
+        :return: True if the import succeeded, see succeeded.
         """
         # Locally import the PromptPlayerVersions function
         from ui import PromptImportAllVersions, PromptPlayerVersions
 
-        # Initialize lists to store players found and not found
-        logs = []
-        players_not_found = []
-
         # If there are multiple versions, prompt the user to select all or a specific one
-        import_all_versions = PromptImportAllVersions()
+        # (a version policy chooses them without prompting)
+        import_all_versions = self.import_all_versions
+        if self.version_policy is not None:
+            import_all_versions = self.version_policy.all_versions
+        elif import_all_versions is None:
+            import_all_versions = PromptImportAllVersions()
+
+        # An import file written to every version (or by a policy) needs no prompts, so it can be
+        # compiled into a plan once & replayed while the file, offsets & player table stay the same
+        plan_path = None
+        if import_all_versions:
+            policy_key = "all-versions"
+        elif self.version_policy is not None:
+            policy_key = self.version_policy.key(self.exporter.find_versions())
+        else:
+            policy_key = None
+        if self.source_path and self.source_path != "api" and policy_key:
+            plan_path = PlanPath(
+                self.source_path, self.exporter.fingerprint(), policy_key
+            )
+            cached_plan = ImportPlan.load(plan_path)
+            if cached_plan is not None and cached_plan.is_current(self.game.memory):
+                return self.replay_plan(cached_plan, plan_path)
+            self.plan = ImportPlan()
+
+        # Players are resolved & their values converted here, while a writer thread
+        # drains the batches to memory in the same order
+        batches = queue.Queue(maxsize=IMPORT_QUEUE_SIZE)
+        writer_errors = []
+        writer = threading.Thread(
+            target=self.write_batches, args=(batches, writer_errors), daemon=True
+        )
+        writer.start()
 
         try:
-            # Iterate through the players in the JSON file
-            for name, data in self.json_file.items():
-                # Check if the player is in the player list
-                self.exporter.find_versions()
-                first_version, versions = self.exporter.find_player_by_name(name)
-                selected_players = []
-                selected_player_objects = []
-
-                # Prompt user to select which versions(s) to use
-                if versions and len(versions) > 1:
-                    if import_all_versions:
-                        selected_players = [versions[version] for version in versions]
-                    else:
-                        selected_players = PromptPlayerVersions(versions)
-
-                    # Compile the selected players into a list of player objects
-                    for player_address in selected_players:
-                        player_address = int(player_address, 16)
-                        player = BuildPlayer(self.game, None, player_address)
-                        if player:
-                            selected_player_objects.append(player)
-                else:
-                    # Only the first version is available, so add it to the list
-                    selected_player_objects.append(first_version)
-
-                # Iterate through the selected players
-                for player in selected_player_objects:
-                    # Check if the player is found in the player list
-                    if not player:
-                        players_not_found.append(name)
-                        logs.append(f"Player not found: {name}")
-                        continue
-
-                    # Iterate through the categories that are written in bytes (only attributes)
-                    for category in written_in_bytes:
-                        if category in data:
-                            try:
-                                for item, new_value in data[category].items():
-                                    # Get the offset information for the category
-                                    offset_info = GetOffset(category, item)
-                                    if not offset_info:
-                                        logs.append(
-                                            f"Information for {item} not found in {category} offsets."
-                                        )
-                                        continue
-
-                                    # Unpack the offset information & write the data to memory
-                                    name = offset_info["name"]
-                                    offset = offset_info["offset"]
-                                    length = offset_info["length"]
-                                    address = player.address + offset
-                                    new_game_value = ConvertToGameValue(new_value, length)
-
-                                    # Write the data to memory
-                                    WriteBinaryBytes(
-                                        self.game, address, length, new_game_value
-                                    )
-
-                            except Exception as e:
-                                logs.append(f"Error writing {new_value} to {name}: {e}")
-
-                    # Iterate through the categories that are written in integers (everything else)
-                    for category in written_in_integers:
-                        if category in data:
-                            try:
-                                for item, new_value in data[category].items():
-                                    offset_info = GetOffset(category, item)
-                                    if not offset_info:
-                                        logs.append(f"Information for {item} not found in {category} offsets.")
-                                        continue
-
-                                    name = offset_info["name"]
-                                    length = offset_info["length"]
-                                    start_bit = offset_info.get("startBit", 0)
-                                    address = ResolveWriteAddress(self.game, player, offset_info)
-
-                                    if isinstance(new_value, str):
-                                        new_game_value = GetCodeFromString(item, new_value)
-                                        if new_game_value is None:
-                                            logs.append(f"Invalid string representation for {name}: {new_value}")
-                                            continue
-                                    else:
-                                        new_game_value = new_value
-
-                                    WriteInteger(
-                                        self.game,
-                                        address,
-                                        length,
-                                        start_bit,
-                                        new_game_value,
-                                    )
-
-                            except Exception as e:
-                                logs.append(f"Error writing {new_value} to {name}: {e}")
+            try:
+                # Iterate through the players in the JSON file, as they're read if it's streamed
+                players = (
+                    self.json_file.items()
+                    if isinstance(self.json_file, dict)
+                    else self.json_file
+                )
+                for name, data in players:
+                    batch = WriteBatch()
+
+                    # Iterate through the selected players
+                    for player in self.select_players(
+                        name, import_all_versions, PromptPlayerVersions
+                    ):
+                        # Check if the player is found in the player list
+                        if not player:
+                            self.players_not_found.append(name)
+                            batch.logs.append(f"Player not found: {name}")
+                            continue
+
+                        # Every version of the player takes the same raw values
+                        if batch.values is None:
+                            with Phase("convert"):
+                                batch.values = self.convert_values(
+                                    data, batch.value_logs, batch.counts
+                                )
+                        batch.players.append(player)
+
+                    batches.put(batch)
+                    if writer_errors:
+                        break
+            finally:
+                # Let the writer finish what was planned
+                batches.put(None)
+                writer.join()
+
+            if writer_errors:
+                raise writer_errors[0]
+
+            # Save the plan along with the logs & failures of its compile
+            if self.plan is not None:
+                self.plan.logs = list(self.logs)
+                self.plan.failed = {
+                    category: count["failed"]
+                    for category, count in self.counts.items()
+                    if count["failed"]
+                }
+                self.plan.save(plan_path)
 
         except Exception as e:
+            self.error = e
             line_no = getattr(e, "__traceback__", None).tb_lineno if getattr(e, "__traceback__", None) else "unknown"
             print(f"\n[red]Error during import at line @{line_no}: {e}.[/red]")
 
         # Write to the log file
-        log_file_path = "configs/logs/import_log.txt"
-        with open(log_file_path, "w") as log_file:
-            if len(logs) > 0:
-                for log in logs:
-                    log_file.write(log + "\n")
-            else:
-                log_file.write("No errors found.\n")
+        log_file_path = self.write_log()
         print(f"\n[green]Import completed. Logs saved to {log_file_path}[/green]")
+        return self.succeeded
+
+    def replay_plan(self, plan, plan_path):
+        """
+        Write a cached plan to memory instead of compiling the import file again.
+
+        :param plan: The ImportPlan.
+        :param plan_path: The path the plan was loaded from.
+        :return: True if the import succeeded, see succeeded.
+        """
+        try:
+            # The values that failed to compile fail the same way again
+            self.logs.extend(plan.logs)
+            for category, failed in plan.failed.items():
+                self.counts[category]["failed"] += failed
+
+            mismatches = [] if self.verify else None
+            with Phase("replay"):
+                plan.replay(
+                    self.game.memory, self.counts, self.schema.player_length, mismatches
+                )
+
+            # A replay is verified region by region, so mismatches only have an address
+            if mismatches is not None:
+                self.verify_counts["checked"] += len(plan.records)
+                self.verify_counts["mismatched"] += len(mismatches)
+                for address, category, expected, actual in mismatches:
+                    self.verify_logs.append(
+                        f"Verify mismatch at {hex(address).upper()} {category}: "
+                        f"wrote {expected}, read back {actual} (raw)"
+                    )
+
+            # Pick up the replayed values in the player list
+            with Phase("list_refresh"):
+                self.exporter.refresh()
+
+        except Exception as e:
+            self.error = e
+            line_no = getattr(e, "__traceback__", None).tb_lineno if getattr(e, "__traceback__", None) else "unknown"
+            print(f"\n[red]Error during import at line @{line_no}: {e}.[/red]")
+
+        # Write to the log file
+        log_file_path = self.write_log()
+        print(
+            f"\n[green]Import completed from {plan_path}. Logs saved to {log_file_path}[/green]"
+        )
+        return self.succeeded
@@ -0,0 +1,329 @@
+import bisect
+import os
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+
+import orjson
+
+# The environment variable that turns instrumentation on: "json", or
+# "prometheus" to also write a Prometheus text dump
+INSTRUMENTATION_ENV = "DRIBBLE_METRICS"
+
+# Where the reports are written, next to the import log
+METRICS_JSON_PATH = "configs/logs/import_metrics.json"
+METRICS_PROMETHEUS_PATH = "configs/logs/import_metrics.prom"
+
+# The upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (
+    0.000001,
+    0.000002,
+    0.000005,
+    0.00001,
+    0.00002,
+    0.00005,
+    0.0001,
+    0.0002,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+)
+
+# The number of bytes read by the typed pymem reads
+TYPED_READ_SIZES = {
+    "read_bool": 1,
+    "read_char": 1,
+    "read_uchar": 1,
+    "read_short": 2,
+    "read_ushort": 2,
+    "read_int": 4,
+    "read_uint": 4,
+    "read_float": 4,
+    "read_long": 4,
+    "read_ulong": 4,
+    "read_longlong": 8,
+    "read_ulonglong": 8,
+    "read_double": 8,
+}
+
+# The active instrumentation, None while it's off
+_instrumentation = None
+
+# The context handed out for phases while instrumentation is off
+_no_phase = nullcontext()
+
+
+# A class to collect the metrics of one kind of memory call
+class CallMetrics(object):
+    """
+    Call count, bytes moved & a latency histogram of one memory method.
+    """
+
+    __slots__ = ("calls", "bytes", "seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, size, seconds):
+        self.calls += 1
+        self.bytes += size
+        self.seconds += seconds
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+
+# A class to time a phase while instrumentation is on
+class PhaseTimer(object):
+    """
+    A context manager adding its wall time to a phase.
+
+    :param instrumentation: The Instrumentation to record to.
+    :param key: The (phase, label) key of the phase.
+    """
+
+    __slots__ = ("instrumentation", "key", "start_time")
+
+    def __init__(self, instrumentation, key):
+        self.instrumentation = instrumentation
+        self.key = key
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        phase = self.instrumentation.phases[self.key]
+        phase[0] += 1
+        phase[1] += time.perf_counter() - self.start_time
+        return False
+
+
+# A class to time & count the calls made to a memory reader
+class InstrumentedMemory(object):
+    """
+    A pymem-style reader that records every read & write it forwards.
+
+    :param memory: The game memory reader instance.
+    :param instrumentation: The Instrumentation to record to.
+    """
+
+    def __init__(self, memory, instrumentation):
+        self.memory = memory
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attribute = getattr(self.memory, name)
+        if name in TYPED_READ_SIZES or name == "read_string":
+            metrics = self.instrumentation.calls[name]
+            size = TYPED_READ_SIZES.get(name)
+
+            def timed_read(address, *args, **kwargs):
+                start_time = time.perf_counter()
+                value = attribute(address, *args, **kwargs)
+                # read_string reads `byte` bytes (50 by default)
+                read_size = size or (args[0] if args else kwargs.get("byte", 50))
+                metrics.record(read_size, time.perf_counter() - start_time)
+                return value
+
+            # Keep the wrapper so the next call skips __getattr__
+            setattr(self, name, timed_read)
+            return timed_read
+        return attribute
+
+    def read_bytes(self, address, length):
+        start_time = time.perf_counter()
+        value = self.memory.read_bytes(address, length)
+        self.instrumentation.calls["read_bytes"].record(
+            length, time.perf_counter() - start_time
+        )
+        return value
+
+    def write_bytes(self, address, value, length):
+        start_time = time.perf_counter()
+        result = self.memory.write_bytes(address, value, length)
+        self.instrumentation.calls["write_bytes"].record(
+            length, time.perf_counter() - start_time
+        )
+        return result
+
+
+# A class to hold every metric collected while instrumentation is on
+class Instrumentation(object):
+    """
+    Memory call metrics, phase timings & counters for one run of the program.
+
+    :param prometheus: Whether reports also include a Prometheus text dump.
+    """
+
+    def __init__(self, prometheus=False):
+        self.prometheus = prometheus
+        self.started = time.time()
+        self.calls = defaultdict(CallMetrics)
+        self.phases = defaultdict(lambda: [0, 0.0])
+        self.counters = defaultdict(int)
+
+    def wrap_memory(self, memory):
+        """
+        Wrap a memory reader so its calls are recorded.
+
+        :param memory: The game memory reader instance.
+        :return: The InstrumentedMemory.
+        """
+        return InstrumentedMemory(memory, self)
+
+    def phase(self, name, label=None):
+        return PhaseTimer(self, (name, label))
+
+    def record_phase(self, name, seconds, label=None):
+        # Add the time of a phase that wasn't timed with phase()
+        phase = self.phases[(name, label)]
+        phase[0] += 1
+        phase[1] += seconds
+
+    def count(self, name, label=None, amount=1):
+        self.counters[(name, label)] += amount
+
+    def report(self):
+        """
+        Get every metric as a JSON-ready dictionary.
+
+        :return: The report dictionary.
+        """
+        bounds = [str(bound) for bound in LATENCY_BUCKETS] + ["+Inf"]
+        return {
+            "started": self.started,
+            "seconds": time.time() - self.started,
+            "memory": {
+                method: {
+                    "calls": metrics.calls,
+                    "bytes": metrics.bytes,
+                    "seconds": metrics.seconds,
+                    "latency_buckets": dict(zip(bounds, metrics.buckets)),
+                }
+                for method, metrics in sorted(self.calls.items())
+            },
+            "phases": [
+                {"phase": name, "label": label, "calls": calls, "seconds": seconds}
+                for (name, label), (calls, seconds) in sorted(
+                    self.phases.items(), key=lambda item: (item[0][0], item[0][1] or "")
+                )
+            ],
+            "counters": [
+                {"counter": name, "label": label, "value": value}
+                for (name, label), value in sorted(
+                    self.counters.items(), key=lambda item: (item[0][0], item[0][1] or "")
+                )
+            ],
+        }
+
+    def prometheus_text(self):
+        """
+        Get every metric in the Prometheus text exposition format.
+
+        :return: The text dump.
+        """
+        calls = sorted(self.calls.items())
+        lines = ["# TYPE dribble_memory_calls_total counter"]
+        for method, metrics in calls:
+            lines.append(f'dribble_memory_calls_total{{method="{method}"}} {metrics.calls}')
+
+        lines.append("# TYPE dribble_memory_bytes_total counter")
+        for method, metrics in calls:
+            lines.append(f'dribble_memory_bytes_total{{method="{method}"}} {metrics.bytes}')
+
+        # Histogram buckets are cumulative in the text format
+        lines.append("# TYPE dribble_memory_latency_seconds histogram")
+        for method, metrics in calls:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, metrics.buckets):
+                cumulative += count
+                lines.append(
+                    f'dribble_memory_latency_seconds_bucket{{method="{method}",le="{bound}"}} {cumulative}'
+                )
+            lines.append(
+                f'dribble_memory_latency_seconds_bucket{{method="{method}",le="+Inf"}} {metrics.calls}'
+            )
+            lines.append(f'dribble_memory_latency_seconds_sum{{method="{method}"}} {metrics.seconds}')
+            lines.append(f'dribble_memory_latency_seconds_count{{method="{method}"}} {metrics.calls}')
+
+        def labels(key_name, name, label):
+            return f'{key_name}="{name}"' + (f',label="{label}"' if label else "")
+
+        lines.append("# TYPE dribble_phase_seconds_total counter")
+        for (name, label), (_, seconds) in self.phases.items():
+            lines.append(f"dribble_phase_seconds_total{{{labels('phase', name, label)}}} {seconds}")
+
+        lines.append("# TYPE dribble_phase_calls_total counter")
+        for (name, label), (phase_calls, _) in self.phases.items():
+            lines.append(f"dribble_phase_calls_total{{{labels('phase', name, label)}}} {phase_calls}")
+
+        lines.append("# TYPE dribble_values_total counter")
+        for (name, label), value in self.counters.items():
+            lines.append(f"dribble_values_total{{{labels('counter', name, label)}}} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_reports(self):
+        """
+        Write the JSON report (& the Prometheus dump if enabled) next to the import log.
+
+        :return: A list of the paths written.
+        """
+        paths = [METRICS_JSON_PATH]
+        with open(METRICS_JSON_PATH, "wb") as f:
+            f.write(orjson.dumps(self.report(), option=orjson.OPT_INDENT_2))
+        if self.prometheus:
+            with open(METRICS_PROMETHEUS_PATH, "w") as f:
+                f.write(self.prometheus_text())
+            paths.append(METRICS_PROMETHEUS_PATH)
+        return paths
+
+
+def EnableInstrumentation(prometheus=False):
+    """
+    Turn instrumentation on.
+
+    :param prometheus: Whether reports also include a Prometheus text dump.
+    :return: The Instrumentation instance.
+    """
+    global _instrumentation
+    _instrumentation = Instrumentation(prometheus)
+    return _instrumentation
+
+
+def EnableInstrumentationFromEnvironment():
+    """
+    Turn instrumentation on if the DRIBBLE_METRICS environment variable asks for it.
+
+    :return: The Instrumentation instance, or None if it's off.
+    """
+    mode = os.environ.get(INSTRUMENTATION_ENV, "").strip().lower()
+    if mode in ("", "0", "off", "false", "no"):
+        return None
+    return EnableInstrumentation(prometheus=mode == "prometheus")
+
+
+def GetInstrumentation():
+    """
+    Get the active instrumentation.
+
+    :return: The Instrumentation instance, or None if it's off.
+    """
+    return _instrumentation
+
+
+def Phase(name, label=None):
+    """
+    Time a phase of the program, if instrumentation is on.
+
+    :param name: The name of the phase.
+    :param label: An optional label, like a category.
+    :return: A context manager (a shared no-op one while instrumentation is off).
+    """
+    if _instrumentation is None:
+        return _no_phase
+    return _instrumentation.phase(name, label)
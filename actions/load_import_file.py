@@ -1,6 +1,117 @@
+import codecs
 import os
 import json
-import requests
+import re
+import orjson
+
+# Size of the chunks read from import files & API responses
+READ_CHUNK_SIZE = 0x10000
+
+# What ends a number, true, false or null
+_SCALAR_END = re.compile(r"[\s,\]}]")
+
+
+def IterJsonObjectItems(chunks):
+    """
+    Lazily yield the (key, value) pairs of a top-level JSON object.
+
+    Only one value is held in memory at a time, so the size of the input
+    doesn't matter as long as each value is reasonably small.
+
+    :param chunks: An iterable of bytes chunks holding the JSON document.
+    :return: A generator of (key, value) pairs.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    exhausted = False
+
+    def fill():
+        # Read the next chunk into the buffer, dropping what was already parsed
+        nonlocal buffer, position, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[position:] + text_decoder.decode(b"", final=True)
+        else:
+            buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        return not exhausted
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n":
+                position += 1
+            if position < len(buffer) or not fill():
+                return
+
+    def expect(characters):
+        # Consume the next non-whitespace character if it's one of the expected ones
+        nonlocal position
+        skip_whitespace()
+        if position >= len(buffer):
+            raise ValueError("Error decoding JSON: unexpected end of file.")
+        character = buffer[position]
+        if character not in characters:
+            raise ValueError(
+                f"Error decoding JSON: expected {' or '.join(characters)}, found {character!r}."
+            )
+        position += 1
+        return character
+
+    def decode_value():
+        # Decode the next value, reading more input until it's complete
+        nonlocal position
+        skip_whitespace()
+        while True:
+            # A number, true, false or null may go on in the next chunk until a delimiter follows
+            if (
+                not exhausted
+                and position < len(buffer)
+                and buffer[position] not in '"{['
+                and _SCALAR_END.search(buffer, position) is None
+            ):
+                fill()
+                continue
+
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if exhausted:
+                    raise ValueError(f"Error decoding JSON: {e}")
+                fill()
+                continue
+
+            position = end
+            return value
+
+    def expect_end():
+        # Only whitespace may follow the object
+        skip_whitespace()
+        if position < len(buffer):
+            raise ValueError(
+                f"Error decoding JSON: unexpected {buffer[position]!r} after the object."
+            )
+
+    expect("{")
+    skip_whitespace()
+    if position < len(buffer) and buffer[position] == "}":
+        position += 1
+        expect_end()
+        return
+
+    while True:
+        key = decode_value()
+        if not isinstance(key, str):
+            raise ValueError("Error decoding JSON: object keys must be strings.")
+        expect(":")
+        yield key, decode_value()
+        if expect(",}") == "}":
+            expect_end()
+            return
 
 
 # A class to load a (.csv, .json) file depending on the file extension and return the data in dictionary format.
@@ -9,48 +120,78 @@ class LoadImportFile:
         self.file_path = file_path
         self.file_type = None
         self.data = None
-        self.valid_file_types = [".json"]
+        self.valid_file_types = [".json", ".jsonl"]
 
     def load_csv(self):
         pass
 
+    def read_chunks(self):
+        with open(self.file_path, "rb") as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def iter_json(self):
+        return IterJsonObjectItems(self.read_chunks())
+
+    def iter_jsonl(self):
+        with open(self.file_path, "rb") as f:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    players = orjson.loads(line)
+                except orjson.JSONDecodeError as e:
+                    raise ValueError(f"Error decoding JSON on line {line_no}: {e}")
+                if not isinstance(players, dict):
+                    raise ValueError(f"Expected an object on line {line_no}.")
+                yield from players.items()
+
     def load_json(self):
-        with open(self.file_path, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError as e:
-                raise ValueError(f"Error decoding JSON: {e}")
+        return dict(self.iter_json())
 
-    def load_file_from_api(self):
-        api_url = "https://drbl.live/players/api/export/"
+    def iter_file_from_api(self):
+        # requests is only needed for the API, so it's imported here instead of at startup
+        import requests
+
+        from actions.api_cache import API_URL, ApiResponseCache
+
+        # Revalidate the cached export, only downloading it (compressed) if it changed
         try:
-            response = requests.get(api_url)
-            response.raise_for_status()
-            return response.json()
+            # The object is read to the end of the response, so the response is cached
+            yield from IterJsonObjectItems(ApiResponseCache().iter_chunks(API_URL))
         except requests.RequestException as e:
             raise ValueError(f"Error fetching data from API: {e}")
 
-    def load_file(self):
-        """Load the file and return the data in dictionary format."""
+    def load_file_from_api(self):
+        return dict(self.iter_file_from_api())
+
+    def iter_file(self):
+        """Lazily yield (player name, categories) pairs from the file."""
         if not self.file_path:
             raise ValueError("File path is empty.")
 
-        if self.file_path != "api":
-            # Check if the file exists
-            if not os.path.isfile(self.file_path):
-                raise FileNotFoundError(f"File not found: {self.file_path}")
+        if self.file_path == "api":
+            return self.iter_file_from_api()
 
-            # Get the file extension
-            _, self.file_type = os.path.splitext(self.file_path)
+        # Check if the file exists
+        if not os.path.isfile(self.file_path):
+            raise FileNotFoundError(f"File not found: {self.file_path}")
 
-            # Check if the file type is valid
-            if self.file_type not in self.valid_file_types:
-                raise ValueError(f"Invalid file type: {self.file_type}.")
+        # Get the file extension
+        _, self.file_type = os.path.splitext(self.file_path)
 
-            if self.file_type == ".json":
-                self.data = self.load_json()
-                
-        else:
-            self.data = self.load_file_from_api()
+        # Check if the file type is valid
+        if self.file_type not in self.valid_file_types:
+            raise ValueError(f"Invalid file type: {self.file_type}.")
+
+        if self.file_type == ".jsonl":
+            return self.iter_jsonl()
+        return self.iter_json()
 
+    def load_file(self):
+        """Load the file and return the data in dictionary format."""
+        self.data = dict(self.iter_file())
         return self.data
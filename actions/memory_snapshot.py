@@ -0,0 +1,193 @@
+import struct
+
+# Size of the blocks fetched for reads outside of the prefetched player table
+SNAPSHOT_BLOCK_SIZE = 0x10000
+
+# Size of the chunks used to read the player table (keeps single reads bounded)
+SNAPSHOT_CHUNK_SIZE = 0x800000
+
+
+def ReadTablePointers(table, record_length, offset):
+    """
+    Read a pointer field of every record of a raw table in one strided pass.
+
+    :param table: The raw table bytes.
+    :param record_length: The length of a single record in bytes.
+    :param offset: The offset of the pointer in a record.
+    :return: A list of pointers, one per record.
+    """
+    count = len(table) // record_length
+    pointers = struct.Struct(f"<{offset}xQ{record_length - offset - 8}x")
+    return [
+        pointer
+        for (pointer,) in pointers.iter_unpack(memoryview(table)[: count * record_length])
+    ]
+
+
+# A class to serve process reads from a local copy of game memory
+class MemorySnapshot(object):
+    """
+    A read-through cache around a pymem-style memory reader.
+
+    The player table can be prefetched with a few large reads, every other read
+    is served from aligned blocks that are fetched once. Anything that isn't a
+    read is forwarded to the wrapped reader.
+
+    :param memory: The game memory reader instance.
+    :param block_size: The size of the blocks fetched on a cache miss.
+    """
+
+    def __init__(self, memory, block_size=SNAPSHOT_BLOCK_SIZE):
+        self.memory = memory
+        self.block_size = block_size
+        self.region_address = None
+        self.region = b""
+        self.blocks = {}
+        self.reads = 0
+
+    def __getattr__(self, name):
+        # Forward anything we don't cache (writes, process info, ...) to the real reader
+        return getattr(self.memory, name)
+
+    def prefetch(self, address, length, chunk_size=SNAPSHOT_CHUNK_SIZE, min_chunk_size=1):
+        """
+        Read a contiguous region of memory in as few reads as possible.
+
+        A chunk that can't be read is retried in halves down to min_chunk_size,
+        so a region that runs past the end of the mapped table keeps every
+        whole piece before the readable memory ends.
+
+        :param address: The start address of the region.
+        :param length: The length of the region in bytes.
+        :param chunk_size: The maximum size of a single read.
+        :param min_chunk_size: The smallest piece a failed chunk is retried in (e.g. a record).
+        :return: The number of bytes that were read.
+        """
+        chunks = []
+        read = 0
+
+        # Chunks are whole pieces, so the region always ends on a piece boundary
+        size = max(chunk_size // min_chunk_size, 1) * min_chunk_size
+
+        while read < length:
+            size = min(size, length - read)
+            try:
+                chunks.append(self.memory.read_bytes(address + read, size))
+            except Exception:
+                # The readable memory ends inside this chunk, narrow down where
+                if size <= min_chunk_size:
+                    break
+                size = max(size // 2 // min_chunk_size, 1) * min_chunk_size
+                continue
+            self.reads += 1
+            read += size
+
+        self.region_address = address
+        self.region = b"".join(chunks)
+        return read
+
+    def fill_blocks(self, address, length):
+        """
+        Fill the block cache for a range of memory with a single read.
+
+        :param address: The start address of the range.
+        :param length: The length of the range in bytes.
+        :return: The number of bytes that were read, 0 if the range can't be read.
+        """
+        first_block = address // self.block_size
+        last_block = (address + length - 1) // self.block_size
+        start = first_block * self.block_size
+        try:
+            data = self.memory.read_bytes(start, (last_block + 1) * self.block_size - start)
+        except Exception:
+            # Leave the range to be read block by block
+            return 0
+        self.reads += 1
+
+        for block_index in range(first_block, last_block + 1):
+            offset = (block_index - first_block) * self.block_size
+            self.blocks[block_index] = data[offset : offset + self.block_size]
+        return len(data)
+
+    def read_bytes(self, address, length):
+        # Serve the read from the prefetched region if possible
+        if self.region_address is not None:
+            start = address - self.region_address
+            if start >= 0 and start + length <= len(self.region):
+                return self.region[start : start + length]
+
+        # Otherwise assemble the read from cached blocks
+        first_block = address // self.block_size
+        last_block = (address + length - 1) // self.block_size
+        data = []
+        for block_index in range(first_block, last_block + 1):
+            block = self.blocks.get(block_index)
+            if block is None:
+                try:
+                    block = self.memory.read_bytes(
+                        block_index * self.block_size, self.block_size
+                    )
+                except Exception:
+                    # The block straddles unreadable memory, read directly instead
+                    self.reads += 1
+                    return self.memory.read_bytes(address, length)
+                self.reads += 1
+                self.blocks[block_index] = block
+            data.append(block)
+
+        start = address - first_block * self.block_size
+        return b"".join(data)[start : start + length]
+
+    def read_bool(self, address):
+        return struct.unpack("<?", self.read_bytes(address, 1))[0]
+
+    def read_uchar(self, address):
+        return struct.unpack("<B", self.read_bytes(address, 1))[0]
+
+    def read_short(self, address):
+        return struct.unpack("<h", self.read_bytes(address, 2))[0]
+
+    def read_ushort(self, address):
+        return struct.unpack("<H", self.read_bytes(address, 2))[0]
+
+    def read_int(self, address):
+        return struct.unpack("<i", self.read_bytes(address, 4))[0]
+
+    def read_uint(self, address):
+        return struct.unpack("<I", self.read_bytes(address, 4))[0]
+
+    def read_longlong(self, address):
+        return struct.unpack("<q", self.read_bytes(address, 8))[0]
+
+    def read_ulonglong(self, address):
+        return struct.unpack("<Q", self.read_bytes(address, 8))[0]
+
+    def read_float(self, address):
+        return struct.unpack("<f", self.read_bytes(address, 4))[0]
+
+    def read_double(self, address):
+        return struct.unpack("<d", self.read_bytes(address, 8))[0]
+
+    def read_string(self, address, byte=50, encoding="UTF-8"):
+        data = self.read_bytes(address, byte)
+        end = data.find(b"\x00")
+        if end != -1:
+            data = data[:end]
+        return data.decode(encoding)
+
+
+# A class to hand a game object to the dribble readers with a snapshot as its memory
+class SnapshotGame(object):
+    """
+    A game object whose memory reads are served by a MemorySnapshot.
+
+    :param game: The game instance to wrap.
+    :param block_size: The size of the blocks fetched on a cache miss.
+    """
+
+    def __init__(self, game, block_size=SNAPSHOT_BLOCK_SIZE):
+        self.game = game
+        self.memory = MemorySnapshot(game.memory, block_size)
+
+    def __getattr__(self, name):
+        return getattr(self.game, name)
@@ -0,0 +1,116 @@
+import os
+
+from actions.build_player_list import NormalizeName
+from actions.load_import_file import LoadImportFile
+from actions.offset_schema import GetSchema
+
+
+# A class to merge several import files into a single import
+class MergedImport(object):
+    """
+    Import files merged per player & per field, the last file to set a value wins.
+
+    Players are matched by normalized name, so every player is resolved and
+    written once however many files mention it. Each value remembers the file
+    it came from for the import log.
+
+    :param import_file_paths: The import files (or "api"), in the order they apply.
+    """
+
+    def __init__(self, import_file_paths):
+        self.import_file_paths = list(import_file_paths)
+        self.players = {}
+        self.sources = {}
+        self.overridden = [0] * len(self.import_file_paths)
+
+    def load(self):
+        """
+        Read every import file & merge its players into the ones read before.
+
+        :return: The number of merged players.
+        """
+        for source, import_file_path in enumerate(self.import_file_paths):
+            for name, data in LoadImportFile(import_file_path).iter_file():
+                self.merge(source, name, data)
+        return len(self.players)
+
+    def merge(self, source, name, data):
+        """
+        Merge the import data of one player.
+
+        :param source: The index of the file the data comes from.
+        :param name: The player name from the import file.
+        :param data: The player's import data by category.
+        :return: None
+        """
+        key = NormalizeName(name)
+        entry = self.players.get(key)
+        if entry is None:
+            # Keep the name as it was first written
+            entry = self.players[key] = (name, {})
+            self.sources[key] = {}
+        merged, sources = entry[1], self.sources[key]
+
+        for category, values in data.items():
+            if not isinstance(values, dict):
+                merged[category] = values
+                continue
+
+            merged_values = merged.setdefault(category, {})
+            category_sources = sources.setdefault(category, {})
+            for item, value in values.items():
+                previous = category_sources.get(item)
+                if previous is not None and previous != source:
+                    self.overridden[previous] += 1
+                merged_values[item] = value
+                category_sources[item] = source
+
+    def items(self):
+        """
+        Get the merged players, in the order they were first seen.
+
+        :return: An iterator of (player name, import data) pairs.
+        """
+        return iter(self.players.values())
+
+    def source_logs(self):
+        """
+        Describe which file each merged value came from.
+
+        Each player gets one line: the file supplying most of its values is
+        given as a count, the values of every other file are listed.
+
+        :return: A list of log lines.
+        """
+        schema = GetSchema()
+        file_names = [os.path.basename(path) for path in self.import_file_paths]
+        logs = []
+        for key, (name, _) in self.players.items():
+            # Only the categories the importer writes count (not "Team" from an export)
+            fields_by_source = {}
+            for category, category_sources in self.sources[key].items():
+                if category not in schema.categories:
+                    continue
+                for item, source in category_sources.items():
+                    fields_by_source.setdefault(source, []).append(f"{category} {item}")
+            if not fields_by_source:
+                continue
+
+            main_source = max(
+                fields_by_source, key=lambda source: (len(fields_by_source[source]), -source)
+            )
+            parts = []
+            for source in sorted(fields_by_source):
+                fields = fields_by_source[source]
+                if source == main_source:
+                    parts.append(f"{len(fields)} values from {file_names[source]}")
+                else:
+                    parts.append(f"{file_names[source]} ({', '.join(fields)})")
+            logs.append(f"{name}: {'; '.join(parts)}")
+
+        # How many values of each file a later file replaced
+        for source, file_name in enumerate(file_names):
+            logs.append(
+                f"{file_name}: {self.overridden[source]} values replaced by later files."
+            )
+        return logs
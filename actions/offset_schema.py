@@ -0,0 +1,160 @@
+from dribble.memory import GetOffsets, written_in_bytes
+
+# The offsets file loaded at startup
+OFFSETS_FILE = "resources/offsets.json"
+
+# The compiled schema, built once from the loaded offsets
+_schema = None
+
+
+def ParseOffsetValue(raw_value):
+    """
+    Parse an offset value from the offsets file.
+
+    :param raw_value: A hex/decimal string or an integer.
+    :return: The value as an integer.
+    """
+    if isinstance(raw_value, str):
+        return int(raw_value, 0)
+    return int(raw_value)
+
+
+# A class to describe a single field of a player record
+class FieldDescriptor(object):
+    """
+    A field from the offsets file with every value pre-computed.
+
+    :param category: The category the field belongs to.
+    :param offset_info: The raw offset entry from the offsets file.
+    """
+
+    __slots__ = (
+        "category",
+        "name",
+        "offset",
+        "deref",
+        "start_bit",
+        "length",
+        "span",
+        "mask",
+        "in_bytes",
+    )
+
+    def __init__(self, category, offset_info):
+        try:
+            self.offset = ParseOffsetValue(offset_info["offset"])
+            raw_deref = offset_info.get("derefAddress")
+            self.deref = ParseOffsetValue(raw_deref) if raw_deref is not None else None
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(
+                f"Invalid offset for {offset_info.get('name')} in {category}: {e}"
+            )
+
+        self.category = category
+        self.name = offset_info["name"]
+        self.start_bit = int(offset_info.get("startBit", 0))
+        self.length = int(offset_info["length"])
+        self.span = (self.start_bit + self.length + 7) // 8
+        self.mask = ((1 << self.length) - 1) << self.start_bit
+        self.in_bytes = category in written_in_bytes
+
+    def __repr__(self):
+        return f"FieldDescriptor({self.category!r}, {self.name!r})"
+
+    def extract(self, buffer, base=0):
+        """
+        Read the raw value of the field from a record buffer.
+
+        :param buffer: The bytes holding the record.
+        :param base: The position of the record in the buffer.
+        :return: The raw integer value.
+        """
+        start = base + self.offset
+        value = int.from_bytes(buffer[start : start + self.span], "little")
+        return (value & self.mask) >> self.start_bit
+
+    def insert(self, buffer, value, base=0):
+        """
+        Merge a raw value into a mutable record buffer, keeping the other bits.
+
+        :param buffer: The bytearray holding the record.
+        :param value: The raw integer value to store.
+        :param base: The position of the record in the buffer.
+        :return: None
+        """
+        start = base + self.offset
+        current = int.from_bytes(buffer[start : start + self.span], "little")
+        current = (current & ~self.mask) | ((int(value) << self.start_bit) & self.mask)
+        buffer[start : start + self.span] = current.to_bytes(self.span, "little")
+
+
+# A class to hold the offsets file compiled into field descriptors
+class OffsetSchema(object):
+    """
+    The offsets file compiled once into descriptors with O(1) lookup.
+
+    :param offsets: The offsets dictionary loaded from the offsets file.
+    """
+
+    def __init__(self, offsets):
+        self.base = {}
+        self.categories = {}
+        self.fields = {}
+        self.sub_record_lengths = {}
+
+        # Parse the base values, keeping lists (offset chains) as lists of integers
+        for key, value in offsets.get("Base", {}).items():
+            if isinstance(value, list):
+                self.base[key] = [ParseOffsetValue(item) for item in value]
+            else:
+                self.base[key] = ParseOffsetValue(value)
+
+        # Compile every field, keyed by (category, name)
+        for category, items in offsets.items():
+            if category == "Base":
+                continue
+
+            descriptors = [FieldDescriptor(category, item) for item in items]
+            self.categories[category] = descriptors
+            for descriptor in descriptors:
+                self.fields[(category, descriptor.name)] = descriptor
+
+                # Track how much of each pointer-targeted sub-record the fields cover
+                if descriptor.deref is not None:
+                    self.sub_record_lengths[descriptor.deref] = max(
+                        self.sub_record_lengths.get(descriptor.deref, 0),
+                        descriptor.offset + descriptor.span,
+                    )
+
+        self.player_length = self.base["Player Offset Length"]
+        self.team_length = self.base["Team Offset Length"]
+
+    def field(self, category, name):
+        """
+        Get the descriptor of a field.
+
+        :param category: The category of the field.
+        :param name: The name of the field.
+        :return: The FieldDescriptor, or None if it doesn't exist.
+        """
+        return self.fields.get((category, name))
+
+    def category_names(self):
+        """
+        Get the names of every field category.
+
+        :return: A list of category names in file order.
+        """
+        return list(self.categories.keys())
+
+
+def GetSchema():
+    """
+    Get the compiled offset schema, compiling the loaded offsets on first use.
+
+    :return: The OffsetSchema instance.
+    """
+    global _schema
+    if _schema is None:
+        _schema = OffsetSchema(GetOffsets(None))
+    return _schema
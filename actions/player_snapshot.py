@@ -0,0 +1,557 @@
+import mmap
+import struct
+import time
+from array import array
+
+import orjson
+from dribble.memory import GetOffsets
+
+from actions.build_player_list import HashPlayerRecords, NormalizeName
+from actions.columnar_decoder import (
+    COLUMN_CATEGORIES,
+    ColumnValues,
+    DecodeColumns,
+    GetRatingTable,
+    SelectColumnFields,
+)
+from actions.import_plan import HashFile
+from actions.memory_snapshot import SNAPSHOT_BLOCK_SIZE, SNAPSHOT_CHUNK_SIZE, MemorySnapshot
+from actions.offset_schema import OFFSETS_FILE, OffsetSchema
+from actions.player_store import STORE_CATEGORIES
+
+# The snapshot file header: magic, format version, table address, slot count,
+# player record length, team count, team record length & metadata length
+SNAPSHOT_MAGIC = b"DRSN"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_HEADER = struct.Struct("<4sHQIIIII")
+
+# Sections start on this boundary, so typed views of them are aligned
+SNAPSHOT_ALIGNMENT = 64
+
+# The categories BuildPlayer decodes into names & strings, saved as the player list holds them
+DECODED_CATEGORIES = tuple(
+    category for category in STORE_CATEGORIES if category not in COLUMN_CATEGORIES
+)
+
+
+def _Align(position):
+    return -(-position // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def _ReadRecords(memory, addresses, length):
+    """
+    Read records scattered through memory, filling the snapshot blocks of nearby records with one read.
+
+    :param memory: The MemorySnapshot to read through.
+    :param addresses: The addresses of the records.
+    :param length: The length of a record in bytes.
+    :return: A dictionary of address -> record bytes.
+    """
+    addresses = sorted(set(addresses))
+    start = 0
+    while start < len(addresses):
+        # Extend the run while the next record is within a block of the last one
+        end = start + 1
+        while (
+            end < len(addresses)
+            and addresses[end] - addresses[end - 1] <= SNAPSHOT_BLOCK_SIZE
+            and addresses[end] + length - addresses[start] <= SNAPSHOT_CHUNK_SIZE
+        ):
+            end += 1
+        memory.fill_blocks(addresses[start], addresses[end - 1] + length - addresses[start])
+        start = end
+
+    return {address: memory.read_bytes(address, length) for address in addresses}
+
+
+def SavePlayerSnapshot(exporter, file_path):
+    """
+    Save the raw player table of a built player list to a snapshot file.
+
+    The file holds the raw player records, the sub-records (Face, Body, ...)
+    and team records they point at, the offsets they were read with, and from
+    the player list the names, teams & the categories BuildPlayer decodes into
+    names & strings (one JSON object per slot), so it can be read back without
+    the game.
+
+    :param exporter: The BuildPlayerList holding the player list.
+    :param file_path: The path of the snapshot file.
+    :return: The number of players saved.
+    """
+    game = exporter.game
+    store = exporter.store
+    schema = OffsetSchema(GetOffsets(None))
+    record_length = schema.player_length
+    team_length = schema.team_length
+    slot_count = exporter.player_list_size
+    if exporter.table_address is None:
+        raise ValueError("The player list has no player table to save.")
+
+    # Read the whole player table at once
+    memory = MemorySnapshot(game.memory)
+    memory.prefetch(exporter.table_address, slot_count * record_length, min_chunk_size=record_length)
+    table = memory.region
+    slot_count = len(table) // record_length
+
+    # Read the team record each player points at, once per team
+    team_pointer_offset = schema.base["Offset Player Team"]
+    team_addresses = []
+    team_indexes = {}
+    teams = []
+    slot_teams = array("i", [-1] * slot_count)
+    names = [None] * slot_count
+    decoded_values = [b""] * slot_count
+    for slot, row in exporter.slot_rows.items():
+        if slot >= slot_count or store.names[row] is None:
+            continue
+        view = store.view(row)
+        names[slot] = [
+            view.name,
+            view.vitals.get("First Name", ""),
+            view.vitals.get("Last Name", ""),
+        ]
+        decoded_values[slot] = orjson.dumps(
+            {category: dict(view[category]) for category in DECODED_CATEGORIES}
+        )
+
+        start = slot * record_length + team_pointer_offset
+        team_address = int.from_bytes(table[start : start + 8], "little")
+        if not team_address:
+            continue
+        team_index = team_indexes.get(team_address)
+        if team_index is None:
+            team_index = team_indexes[team_address] = len(team_addresses)
+            team_addresses.append(team_address)
+            teams.append(dict(view.team))
+        slot_teams[slot] = team_index
+
+    records = _ReadRecords(memory, team_addresses, team_length)
+    team_records = b"".join(records[team_address] for team_address in team_addresses)
+
+    # Read the sub-records of every player, leaving empty slots zeroed
+    sub_records = []
+    for deref, length in sorted(schema.sub_record_lengths.items()):
+        addresses = {}
+        for slot, name in enumerate(names):
+            if name is None:
+                continue
+            start = slot * record_length + deref
+            address = int.from_bytes(table[start : start + 8], "little")
+            if address:
+                addresses[slot] = address
+        records = _ReadRecords(memory, addresses.values(), length)
+
+        section = bytearray(slot_count * length)
+        for slot, address in addresses.items():
+            section[slot * length : (slot + 1) * length] = records[address]
+        sub_records.append((deref, length, bytes(section)))
+
+    # Each slot's decoded categories are found through an offset, so one player is parsed alone
+    values_offsets = array("Q", [0])
+    for values in decoded_values:
+        values_offsets.append(values_offsets[-1] + len(values))
+    values_section = b"".join(decoded_values)
+
+    # The names are only parsed when they're needed, so they get their own section
+    names_section = orjson.dumps(names)
+    player_count = sum(1 for name in names if name is not None)
+    metadata = orjson.dumps(
+        {
+            "created": time.time(),
+            "offsets_hash": HashFile(OFFSETS_FILE),
+            "offsets": GetOffsets(None),
+            "player_count": player_count,
+            "names_length": len(names_section),
+            "values_length": len(values_section),
+            "teams": teams,
+            "sub_records": [[deref, length] for deref, length, _ in sub_records],
+        }
+    )
+
+    # Write the header & metadata, then each section on an aligned boundary
+    sections = [
+        table,
+        team_records,
+        array("Q", team_addresses).tobytes(),
+        slot_teams.tobytes(),
+        *[section for _, _, section in sub_records],
+        names_section,
+        values_offsets.tobytes(),
+        values_section,
+    ]
+    with open(file_path, "wb") as f:
+        f.write(
+            SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC,
+                SNAPSHOT_VERSION,
+                exporter.table_address,
+                slot_count,
+                record_length,
+                len(team_addresses),
+                team_length,
+                len(metadata),
+            )
+        )
+        f.write(metadata)
+        for section in sections:
+            f.write(b"\0" * (_Align(f.tell()) - f.tell()))
+            f.write(section)
+
+    return player_count
+
+
+# A class to read a saved player table without the game
+class PlayerSnapshot(object):
+    """
+    A snapshot file memory-mapped back for offline exports, lookups & diffs.
+
+    Nothing is decoded when the snapshot is opened: records are views of the
+    mapping, and fields are decoded straight from it when they're asked for.
+    The column categories are decoded from the raw records, the others are
+    read as the player list held them when the snapshot was saved.
+
+    :param file_path: The path of the snapshot file.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.file = open(file_path, "rb")
+        try:
+            self.mapping = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = memoryview(self.mapping)
+            (
+                magic,
+                version,
+                self.table_address,
+                self.slot_count,
+                self.record_length,
+                team_count,
+                self.team_length,
+                metadata_length,
+            ) = SNAPSHOT_HEADER.unpack_from(self.buffer)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"Not a player snapshot: {file_path}")
+
+            position = SNAPSHOT_HEADER.size
+            metadata = orjson.loads(self.buffer[position : position + metadata_length])
+            position += metadata_length
+        except (struct.error, orjson.JSONDecodeError) as e:
+            self.close()
+            raise ValueError(f"Invalid player snapshot {file_path}: {e}")
+        except Exception:
+            self.close()
+            raise
+
+        def section(length):
+            # Take the next aligned section of the file
+            nonlocal position
+            position = _Align(position)
+            view = self.buffer[position : position + length]
+            position += length
+            return view
+
+        self.table = section(self.slot_count * self.record_length)
+        self.team_records = section(team_count * self.team_length)
+        self.team_addresses = section(team_count * 8).cast("Q")
+        self.slot_teams = section(self.slot_count * 4).cast("i")
+        self.sub_records = {
+            deref: (section(self.slot_count * length), length)
+            for deref, length in metadata["sub_records"]
+        }
+
+        self.created = metadata["created"]
+        self.offsets_hash = metadata["offsets_hash"]
+        self.schema = OffsetSchema(metadata["offsets"])
+        self.names_section = section(metadata["names_length"])
+        self.values_offsets = section((self.slot_count + 1) * 8).cast("Q")
+        self.values_section = section(metadata["values_length"])
+        self.player_count = metadata["player_count"]
+        self.teams = metadata["teams"]
+        self._names = None
+        self._slots = None
+        self._name_index = None
+        self.columns = None
+        self.versions = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.player_count
+
+    @property
+    def names(self):
+        # The [unique name, first name, last name] of each slot, None for empty slots
+        if self._names is None:
+            self._names = orjson.loads(self.names_section)
+        return self._names
+
+    @property
+    def slots(self):
+        # The table slot of each unique player name
+        if self._slots is None:
+            self._slots = {
+                name[0]: slot for slot, name in enumerate(self.names) if name is not None
+            }
+        return self._slots
+
+    def close(self):
+        """Release the mapping & the file."""
+        for name in (
+            "team_addresses",
+            "slot_teams",
+            "table",
+            "team_records",
+            "names_section",
+            "values_offsets",
+            "values_section",
+            "buffer",
+        ):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        for view, _ in self.__dict__.pop("sub_records", {}).values():
+            view.release()
+        self.columns = None
+        if getattr(self, "mapping", None) is not None:
+            try:
+                self.mapping.close()
+            except BufferError:
+                pass  # Records handed out are still in use, the mapping goes with them
+            self.mapping = None
+        self.file.close()
+
+    def address(self, slot):
+        return self.table_address + slot * self.record_length
+
+    def record(self, slot):
+        """
+        Get the raw record of a table slot, without copying it.
+
+        :param slot: The table slot.
+        :return: A memoryview of the record.
+        """
+        start = slot * self.record_length
+        return self.table[start : start + self.record_length]
+
+    def team(self, slot):
+        """
+        Get the team of a table slot.
+
+        :param slot: The table slot.
+        :return: The team dictionary, empty if the player has no team.
+        """
+        team_index = self.slot_teams[slot]
+        return self.teams[team_index] if team_index >= 0 else {}
+
+    def team_record(self, slot):
+        """
+        Get the raw team record of a table slot, without copying it.
+
+        :param slot: The table slot.
+        :return: A memoryview of the team record, or None if the player has no team.
+        """
+        team_index = self.slot_teams[slot]
+        if team_index < 0:
+            return None
+        start = team_index * self.team_length
+        return self.team_records[start : start + self.team_length]
+
+    def decoded_values(self, slot):
+        """
+        Get the categories of a table slot that BuildPlayer decoded, as the player list held them.
+
+        :param slot: The table slot.
+        :return: A dictionary of category -> values.
+        """
+        start = self.values_offsets[slot]
+        end = self.values_offsets[slot + 1]
+        return orjson.loads(self.values_section[start:end]) if end > start else {}
+
+    def value(self, slot, field):
+        """
+        Decode one field of a column category from the raw records of a table slot.
+
+        :param slot: The table slot.
+        :param field: The FieldDescriptor of the field.
+        :return: The value, as a rating for fields written in bytes.
+        """
+        if field.deref is None:
+            value = field.extract(self.table, slot * self.record_length)
+        else:
+            sub_record, length = self.sub_records[field.deref]
+            value = field.extract(sub_record, slot * length)
+        if field.in_bytes:
+            value = GetRatingTable(field.length)[value]
+        return value
+
+    def decode_columns(self):
+        """
+        Decode every field of the column categories for every slot, straight from the mapping.
+
+        :return: A dictionary of category -> {field name: list of values}.
+        """
+        if self.columns is not None:
+            return self.columns
+
+        decoded = DecodeColumns(
+            self.table, self.slot_count, self.record_length, SelectColumnFields(self.schema)
+        )
+        self.columns = {
+            category: {
+                field_name: ColumnValues(column) for field_name, column in category_columns.items()
+            }
+            for category, category_columns in decoded.items()
+        }
+        return self.columns
+
+    def player_data(self, slot, columns=None):
+        """
+        Get the data of a table slot in the player dump layout.
+
+        :param slot: The table slot.
+        :param columns: Columns from decode_columns when many slots are read,
+            otherwise only this slot's fields are decoded from the mapping.
+        :return: A dictionary of "Team" & category -> values.
+        """
+        data = {"Team": self.team(slot)}
+        decoded_values = self.decoded_values(slot)
+        for category in STORE_CATEGORIES:
+            if category not in COLUMN_CATEGORIES:
+                data[category] = decoded_values.get(category, {})
+            elif columns is not None:
+                data[category] = {
+                    field_name: column[slot] for field_name, column in columns[category].items()
+                }
+            else:
+                data[category] = {
+                    field.name: self.value(slot, field)
+                    for field in self.schema.categories.get(category, [])
+                    if field.deref is None
+                }
+        return data
+
+    def get(self, unique_name, default=None):
+        slot = self.slots.get(unique_name)
+        return self.player_data(slot) if slot is not None else default
+
+    def items(self):
+        """
+        Lazily yield (unique player name, player data) pairs, e.g. for StreamExport.
+
+        Every slot is read, so the whole table is decoded column-wise first.
+
+        :return: A generator of pairs in table order.
+        """
+        columns = self.decode_columns()
+        for slot, name in enumerate(self.names):
+            if name is not None:
+                yield name[0], self.player_data(slot, columns)
+
+    def find_versions(self):
+        """
+        Find the versions of every player, like BuildPlayerList.find_versions.
+
+        :return: A dictionary of player name -> {"name on team": address}.
+        """
+        if self.versions:
+            return self.versions
+
+        versions = {}
+        for slot, name in enumerate(self.names):
+            if name is None:
+                continue
+            player_name = f"{name[1]} {name[2]}"
+            player_team_key = self.team(slot).get("Key", "Unknown")
+            versions.setdefault(player_name, {})[
+                f"{player_name} on {player_team_key}"
+            ] = hex(self.address(slot)).upper()
+
+        self.versions = versions
+        return versions
+
+    @property
+    def name_index(self):
+        # The table slots of each normalized unique & "First Last" name
+        if self._name_index is None:
+            name_index = {}
+            for slot, names in enumerate(self.names):
+                if names is None:
+                    continue
+                for name in {NormalizeName(names[0]), NormalizeName(f"{names[1]} {names[2]}")}:
+                    name_index.setdefault(name, []).append(slot)
+            self._name_index = name_index
+        return self._name_index
+
+    def find_slots(self, name):
+        """
+        Find the table slots of a player by name.
+
+        :param name: The player name, optionally with a duplicate suffix like "(2)".
+        :return: A list of table slots.
+        """
+        return list(self.name_index.get(NormalizeName(name), ()))
+
+
+def DiffSnapshots(old, new):
+    """
+    Compare two snapshots of the same player table slot by slot.
+
+    Only the slots whose raw records differ are decoded.
+
+    :param old: The older PlayerSnapshot.
+    :param new: The newer PlayerSnapshot.
+    :return: A dictionary with the added & removed player names, and the
+        changed players as {name: {category: {field: [old value, new value]}}}.
+    """
+    if old.offsets_hash != new.offsets_hash:
+        raise ValueError("The snapshots were taken with different offsets.")
+
+    # Hash every record (and sub-record) of both tables to find the changed slots
+    def hashes(snapshot):
+        slot_hashes = [HashPlayerRecords(snapshot.table, snapshot.record_length)]
+        for deref in sorted(snapshot.sub_records):
+            sub_record, length = snapshot.sub_records[deref]
+            slot_hashes.append(HashPlayerRecords(sub_record, length))
+        return list(zip(*slot_hashes))
+
+    old_hashes = hashes(old)
+    new_hashes = hashes(new)
+    report = {"added": [], "removed": [], "changed": {}}
+    for slot in range(max(old.slot_count, new.slot_count)):
+        old_name = old.names[slot] if slot < old.slot_count else None
+        new_name = new.names[slot] if slot < new.slot_count else None
+        if old_name is None and new_name is None:
+            continue
+
+        # A different player in the slot is a removal & an addition
+        if old_name is None or new_name is None or old_name[1:] != new_name[1:]:
+            if old_name is not None:
+                report["removed"].append(old_name[0])
+            if new_name is not None:
+                report["added"].append(new_name[0])
+            continue
+
+        if old_hashes[slot] == new_hashes[slot] and old.team(slot) == new.team(slot):
+            continue
+
+        changes = {}
+        if old.team(slot) != new.team(slot):
+            changes["Team"] = [old.team(slot), new.team(slot)]
+        old_data = old.player_data(slot)
+        new_data = new.player_data(slot)
+        for category in STORE_CATEGORIES:
+            old_values = old_data[category]
+            new_values = new_data[category]
+            for field_name in {**old_values, **new_values}:
+                old_value = old_values.get(field_name)
+                new_value = new_values.get(field_name)
+                if old_value != new_value:
+                    changes.setdefault(category, {})[field_name] = [old_value, new_value]
+        if changes:
+            report["changed"][new_name[0]] = changes
+
+    return report
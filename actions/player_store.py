@@ -0,0 +1,354 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+
+# The player list categories & the player object attributes they come from
+STORE_CATEGORIES = {
+    "Vitals": "vitals",
+    "Attributes": "attributes",
+    "Badges": "badges",
+    "Tendencies": "tendencies",
+    "Hotzones": "hotzones",
+    "Signatures": "signatures",
+    "Accessories": "accessories",
+    "Gear": "gear",
+}
+
+
+def _IsColumnInteger(value):
+    """Check if a value fits an integer column (bools keep their type in a list)."""
+    return type(value) is int and -(1 << 63) <= value < (1 << 63)
+
+
+# A class to hold the player list in one column per field
+class PlayerStore(object):
+    """
+    A compact, column-per-field store of the player list.
+
+    Integer fields are kept in typed arrays, anything else (names, strings and
+    fields the first player doesn't have) in a plain list, and field names are
+    interned. Players are read through lightweight PlayerView
+    rows, and the store itself reads like the old player dump: a mapping of
+    unique player name -> player data.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.rows = {}
+        self.addresses = array("Q")
+        self.team_ids = array("I")
+        self.teams = []
+        self.team_keys = {}
+        self.team_objects = {}
+        self.columns = {category: {} for category in STORE_CATEGORIES}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return (name for name in self.names if name is not None)
+
+    def __contains__(self, unique_name):
+        return unique_name in self.rows
+
+    def __getitem__(self, unique_name):
+        return PlayerView(self, self.rows[unique_name])
+
+    def get(self, unique_name, default=None):
+        row = self.rows.get(unique_name)
+        return PlayerView(self, row) if row is not None else default
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [
+            PlayerView(self, row)
+            for row, name in enumerate(self.names)
+            if name is not None
+        ]
+
+    def items(self):
+        return [
+            (name, PlayerView(self, row))
+            for row, name in enumerate(self.names)
+            if name is not None
+        ]
+
+    def view(self, row):
+        """
+        Get the view of a player row.
+
+        :param row: The row of the player.
+        :return: The PlayerView.
+        """
+        return PlayerView(self, row)
+
+    def append(self, unique_name, player):
+        """
+        Add a player object to the store.
+
+        :param unique_name: The unique (possibly suffixed) name of the player.
+        :param player: The player object.
+        :return: The row of the player.
+        """
+        row = len(self.names)
+        self.names.append(unique_name)
+        self.rows[unique_name] = row
+        self.addresses.append(player.address)
+
+        self.team_ids.append(self._team_id(player.team))
+
+        for category, attribute in STORE_CATEGORIES.items():
+            columns = self.columns[category]
+            values = getattr(player, attribute, None) or {}
+            for field_name, value in values.items():
+                column = columns.get(field_name)
+                if column is None:
+                    # A field seen for the first time is missing for the earlier rows,
+                    # so only a field of the first row starts out as a typed array
+                    if row == 0 and _IsColumnInteger(value):
+                        column = array("q")
+                    else:
+                        column = [None] * row
+                    columns[sys.intern(field_name)] = column
+                if type(column) is list or _IsColumnInteger(value):
+                    column.append(value)
+                else:
+                    columns[field_name] = list(column) + [value]
+
+            # Keep the columns aligned for fields the player doesn't have
+            if len(columns) != len(values):
+                for field_name, column in columns.items():
+                    if len(column) == row:
+                        if type(column) is not list:
+                            column = columns[field_name] = list(column)
+                        column.append(None)
+
+        return row
+
+    def _team_id(self, team):
+        # A team dictionary already shared by a TeamCache is found by identity
+        team_id = self.team_objects.get(id(team))
+        if team_id is not None:
+            return team_id
+
+        # Share one team dictionary between every player of a team
+        team = team or {}
+        team_key = tuple(sorted(team.items()))
+        team_id = self.team_keys.get(team_key)
+        if team_id is None:
+            team_id = len(self.teams)
+            self.teams.append(team)
+            self.team_keys[team_key] = team_id
+            # The dictionary is kept in self.teams, so its id stays unique
+            self.team_objects[id(team)] = team_id
+        return team_id
+
+    def update(self, row, player):
+        """
+        Overwrite the values of a row with a freshly read player object.
+
+        :param row: The row of the player.
+        :param player: The player object.
+        :return: None
+        """
+        self.addresses[row] = player.address
+        self.team_ids[row] = self._team_id(player.team)
+
+        for category, attribute in STORE_CATEGORIES.items():
+            columns = self.columns[category]
+            values = getattr(player, attribute, None) or {}
+            for field_name, value in values.items():
+                if field_name in columns:
+                    self.set_value(category, field_name, row, value)
+
+    def set_team(self, row, team):
+        """
+        Change the team of one player.
+
+        :param row: The row of the player.
+        :param team: The team dictionary.
+        :return: None
+        """
+        self.team_ids[row] = self._team_id(team)
+
+    def remove(self, row):
+        """
+        Remove a player from the store (the row itself is left unused).
+
+        :param row: The row of the player.
+        :return: None
+        """
+        name = self.names[row]
+        if name is not None:
+            del self.rows[name]
+            self.names[row] = None
+
+    def value(self, category, field_name, row):
+        return self.columns[category][field_name][row]
+
+    def set_value(self, category, field_name, row, value):
+        """
+        Change the value of a field for one player.
+
+        :param category: The category of the field.
+        :param field_name: The name of the field.
+        :param row: The row of the player.
+        :param value: The new value.
+        :return: None
+        """
+        columns = self.columns[category]
+        column = columns[field_name]
+        if isinstance(column, array) and not _IsColumnInteger(value):
+            column = columns[field_name] = list(column)
+        column[row] = value
+
+
+# A class to read one category of one player from the store
+class CategoryView(MutableMapping):
+    """
+    A dictionary-like view of one category of a player in the store.
+    """
+
+    __slots__ = ("store", "category", "row")
+
+    def __init__(self, store, category, row):
+        self.store = store
+        self.category = category
+        self.row = row
+
+    def __getitem__(self, field_name):
+        value = self.store.columns[self.category][field_name][self.row]
+        if value is None:
+            raise KeyError(field_name)
+        return value
+
+    def __setitem__(self, field_name, value):
+        if field_name not in self.store.columns[self.category]:
+            raise KeyError(field_name)
+        self.store.set_value(self.category, field_name, self.row, value)
+
+    def __delitem__(self, field_name):
+        raise TypeError("Fields can't be removed from the player store.")
+
+    def __iter__(self):
+        columns = self.store.columns[self.category]
+        return (name for name, column in columns.items() if column[self.row] is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+# A class to read one player from the store
+class PlayerView(object):
+    """
+    A lightweight row of the player store.
+
+    It exposes the same attributes as a player object (address, team, vitals,
+    attributes, ...) and the same keys as a player dump entry ("Address",
+    "Team", "Vitals", ...).
+    """
+
+    __slots__ = ("store", "row")
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, PlayerView)
+            and other.store is self.store
+            and other.row == self.row
+        )
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    def __repr__(self):
+        return f"PlayerView({self.store.names[self.row]!r})"
+
+    @property
+    def name(self):
+        return self.store.names[self.row]
+
+    @property
+    def address(self):
+        return self.store.addresses[self.row]
+
+    @property
+    def team(self):
+        return self.store.teams[self.store.team_ids[self.row]]
+
+    @property
+    def vitals(self):
+        return CategoryView(self.store, "Vitals", self.row)
+
+    @property
+    def attributes(self):
+        return CategoryView(self.store, "Attributes", self.row)
+
+    @property
+    def badges(self):
+        return CategoryView(self.store, "Badges", self.row)
+
+    @property
+    def tendencies(self):
+        return CategoryView(self.store, "Tendencies", self.row)
+
+    @property
+    def hotzones(self):
+        return CategoryView(self.store, "Hotzones", self.row)
+
+    @property
+    def signatures(self):
+        return CategoryView(self.store, "Signatures", self.row)
+
+    @property
+    def accessories(self):
+        return CategoryView(self.store, "Accessories", self.row)
+
+    @property
+    def gear(self):
+        return CategoryView(self.store, "Gear", self.row)
+
+    def __getitem__(self, key):
+        if key == "Address":
+            return self.address
+        if key == "Team":
+            return self.team
+        if key in STORE_CATEGORIES:
+            return CategoryView(self.store, key, self.row)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in ("Address", "Team") or key in STORE_CATEGORIES
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return ["Address", "Team", *STORE_CATEGORIES]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self, include_address=False):
+        """
+        Copy the player into a plain dictionary, in the player dump layout.
+
+        :param include_address: Whether to include the "Address" key.
+        :return: A dictionary of category -> values.
+        """
+        data = {"Address": self.address} if include_address else {}
+        data["Team"] = self.team
+        for category in STORE_CATEGORIES:
+            data[category] = dict(CategoryView(self.store, category, self.row))
+        return data
@@ -0,0 +1,95 @@
+import hashlib
+
+from pymem.exception import MemoryReadError
+
+from actions.memory_snapshot import ReadTablePointers
+
+# The most team records read in one go, a wider spread is left to the block cache
+TEAM_TABLE_MAX_TEAMS = 0x400
+
+
+# A class to share decoded teams between the players of a team
+class TeamCache(object):
+    """
+    Team pointer -> decoded team dictionary, shared by every player of the team.
+
+    The team pointers of every player are taken from the raw player table and
+    the records they point at are read with one bulk read, so building the
+    players of a team reads its record from the snapshot instead of the game.
+    Each team record is hashed, so a refresh can tell which teams changed.
+
+    BuildPlayer still decodes the team of every player it builds, the cache
+    only saves the game reads & keeps one dictionary per team in the list.
+
+    :param team_length: The length of a team record in bytes.
+    """
+
+    def __init__(self, team_length):
+        self.team_length = team_length
+        self.teams = {}
+        self.slot_teams = []
+        self.record_hashes = {}
+
+    def load(self, memory, table, record_length, team_offset):
+        """
+        Read the team records the players of a raw player table point at.
+
+        :param memory: The MemorySnapshot the players are built through.
+        :param table: The raw player table bytes.
+        :param record_length: The length of a player record in bytes.
+        :param team_offset: The offset of the team pointer in a player record.
+        :return: The number of teams found.
+        """
+        self.teams = {}
+        self.record_hashes = {}
+        self.slot_teams = ReadTablePointers(table, record_length, team_offset)
+        team_addresses = set(self.slot_teams)
+        team_addresses.discard(0)
+        if not team_addresses:
+            return 0
+
+        # Teams live in one table, so a single read covers all of them
+        start = min(team_addresses)
+        length = max(team_addresses) + self.team_length - start
+        if length <= TEAM_TABLE_MAX_TEAMS * self.team_length:
+            memory.fill_blocks(start, length)
+
+        for team_address in team_addresses:
+            try:
+                record = memory.read_bytes(team_address, self.team_length)
+            except MemoryReadError:
+                continue  # Not a team, ReadableSlots leaves the slot out too
+            self.record_hashes[team_address] = hashlib.blake2b(
+                record, digest_size=16
+            ).digest()
+        return len(team_addresses)
+
+    def changed_teams(self, record_hashes):
+        """
+        Find the teams whose record changed since an earlier load.
+
+        :param record_hashes: The record_hashes of the earlier load.
+        :return: A set of the team addresses whose record is different now.
+        """
+        return {
+            team_address
+            for team_address, record_hash in self.record_hashes.items()
+            if team_address in record_hashes and record_hashes[team_address] != record_hash
+        }
+
+    def team_address(self, slot):
+        # The team pointer of a slot, 0 for free agents & slots past the table
+        return self.slot_teams[slot] if slot < len(self.slot_teams) else 0
+
+    def share(self, slot, team):
+        """
+        Get the shared team dictionary of a player.
+
+        :param slot: The player's table slot.
+        :param team: The team dictionary the player was built with.
+        :return: The first dictionary seen for the same team pointer.
+        """
+        team_address = self.team_address(slot)
+        if not team_address:
+            return team
+        return self.teams.setdefault(team_address, team)
@@ -0,0 +1,115 @@
+import hashlib
+
+import orjson
+
+from actions.build_player_list import NormalizeName
+
+# The version policies a headless import can use
+VERSION_POLICIES = ("first", "all", "team")
+
+
+def VersionTeamKey(version_name):
+    """
+    Get the team Key of a version from its "name on Key" label.
+
+    :param version_name: The version label from find_versions.
+    :return: The team Key.
+    """
+    return version_name.rsplit(" on ", 1)[-1]
+
+
+# A class to choose the versions of a player without prompting
+class VersionPolicy(object):
+    """
+    A rule for which versions of a player an import entry is written to.
+
+    :param policy: "first" (the first occurrence), "all", or "team" (the
+        versions on one of team_keys, falling back to the first occurrence).
+    :param team_keys: The team Keys used by the "team" policy.
+    :param overrides: Optional dictionary of player name -> "first", "all", or a
+        list of team Keys / version addresses, taking priority over the policy.
+    """
+
+    def __init__(self, policy="first", team_keys=(), overrides=None):
+        if policy not in VERSION_POLICIES:
+            raise ValueError(f"Invalid version policy: {policy}.")
+        if policy == "team" and not team_keys:
+            raise ValueError("The team version policy needs at least one team Key.")
+
+        self.policy = policy
+        self.team_keys = list(team_keys)
+        self.overrides = {}
+        for name, rule in (overrides or {}).items():
+            if not (rule in ("first", "all") or isinstance(rule, list)):
+                raise ValueError(f"Invalid version override for {name}: {rule}.")
+            self.overrides[NormalizeName(name)] = rule
+
+    @classmethod
+    def from_override_file(cls, policy, team_keys, override_path):
+        """
+        Create a policy with the overrides read from a JSON file.
+
+        :param policy: The policy name.
+        :param team_keys: The team Keys used by the "team" policy.
+        :param override_path: The path of a JSON object of player name -> rule.
+        :return: The VersionPolicy.
+        """
+        overrides = None
+        if override_path:
+            with open(override_path, "rb") as f:
+                overrides = orjson.loads(f.read())
+            if not isinstance(overrides, dict):
+                raise ValueError("The version override file must hold a JSON object.")
+        return cls(policy, team_keys, overrides)
+
+    @property
+    def all_versions(self):
+        # Whether every player gets all of its versions
+        return self.policy == "all" and not self.overrides
+
+    @property
+    def reads_teams(self):
+        # Whether versions are chosen by team (or address), so a trade changes the selection
+        return self.policy == "team" or any(
+            isinstance(rule, list) for rule in self.overrides.values()
+        )
+
+    def key(self, versions=None):
+        """
+        Get a key describing the policy, for caching compiled import plans.
+
+        A policy that chooses versions by team also covers the versions it
+        chooses from, so a plan isn't replayed to a player who left the team.
+
+        :param versions: The versions from find_versions the policy selects from.
+        :return: The policy key.
+        """
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(orjson.dumps(self.overrides, option=orjson.OPT_SORT_KEYS))
+        if self.reads_teams and versions:
+            digest.update(orjson.dumps(versions, option=orjson.OPT_SORT_KEYS))
+        return f"{self.policy}:{','.join(self.team_keys)}:{digest.hexdigest()}"
+
+    def select(self, name, versions):
+        """
+        Choose the versions of a player.
+
+        :param name: The player name from the import file.
+        :param versions: The player's versions from find_versions ("name on Key" -> address).
+        :return: A list of the selected version addresses (hex strings).
+        """
+        rule = self.overrides.get(NormalizeName(name), self.policy)
+        if rule == "all":
+            return list(versions.values())
+        if rule == "first":
+            return list(versions.values())[:1]
+
+        # Match versions by team Key (or by address, for overrides)
+        wanted = self.team_keys if rule == "team" else rule
+        wanted = {str(item).upper() for item in wanted}
+        selected = [
+            address
+            for version_name, address in versions.items()
+            if VersionTeamKey(version_name).upper() in wanted or address.upper() in wanted
+        ]
+        return selected or list(versions.values())[:1]
@@ -0,0 +1,206 @@
+# Dirty ranges closer than this many bytes are merged into a single write
+COALESCE_GAP = 16
+
+
+def ReadSubRecordAddress(memory, pointer_address):
+    """
+    Read the address of a pointer-targeted sub-record (Face, Body, ...).
+
+    :param memory: The game memory reader instance.
+    :param pointer_address: The address holding the 8-byte pointer.
+    :return: The address of the sub-record.
+    """
+    ptr_bytes = memory.read_bytes(pointer_address, 8)
+    sub_ptr = int.from_bytes(ptr_bytes, byteorder="little")
+
+    if not sub_ptr:
+        raise ValueError(f"Null pointer at {hex(pointer_address)}")
+
+    return sub_ptr
+
+
+# A class to stage changes to a record in a local copy before writing them
+class ShadowRecord(object):
+    """
+    A local copy of a record in game memory that collects staged changes.
+
+    :param memory: The game memory reader instance.
+    :param address: The address of the record.
+    :param length: The length of the record in bytes.
+    """
+
+    def __init__(self, memory, address, length):
+        self.memory = memory
+        self.address = address
+        self.original = memory.read_bytes(address, length)
+        self.record = bytearray(self.original)
+
+    def stage(self, field, value):
+        """
+        Merge a raw field value into the local copy.
+
+        :param field: The FieldDescriptor of the field.
+        :param value: The raw integer value.
+        :return: None
+        """
+        field.insert(self.record, value)
+
+    def merge(self, offset, span, mask, value):
+        """
+        Merge a value that is already shifted into its mask into the local copy.
+
+        :param offset: The offset of the value in the record.
+        :param span: The number of bytes the value spans.
+        :param mask: The bits of the span the value covers.
+        :param value: The shifted raw value.
+        :return: True if memory held a different value.
+        """
+        current = int.from_bytes(self.record[offset : offset + span], "little")
+        merged = (current & ~mask) | (value & mask)
+        self.record[offset : offset + span] = merged.to_bytes(span, "little")
+        original = int.from_bytes(self.original[offset : offset + span], "little")
+        return (original & mask) != (value & mask)
+
+    def dirty_ranges(self, gap=COALESCE_GAP):
+        """
+        Get the byte ranges that differ from memory, merging nearby ranges.
+
+        :param gap: The largest run of unchanged bytes that is merged over.
+        :return: A list of (start, end) offsets into the record.
+        """
+        ranges = []
+        for index, (old, new) in enumerate(zip(self.original, self.record)):
+            if old == new:
+                continue
+            if ranges and index - ranges[-1][1] <= gap:
+                ranges[-1][1] = index + 1
+            else:
+                ranges.append([index, index + 1])
+        return ranges
+
+    def flush(self):
+        """
+        Write the changed byte ranges back to memory.
+
+        :return: The number of writes made.
+        """
+        ranges = self.dirty_ranges()
+        for start, end in ranges:
+            self.memory.write_bytes(
+                self.address + start, bytes(self.record[start:end]), end - start
+            )
+        self.original = bytes(self.record)
+        return len(ranges)
+
+    def read_back(self):
+        """
+        Read the record back from memory, e.g. to verify a flush.
+
+        :return: The bytes memory holds for the record now.
+        """
+        return self.memory.read_bytes(self.address, len(self.record))
+
+
+# A class to collect every change of one player and write them together
+class PlayerWriteTransaction(object):
+    """
+    Stage all changes to a player in shadow records and flush them at once.
+
+    The player record and each pointer-targeted sub-record are read once, on
+    the first change staged to them, so a sub-record pointer is also read once.
+
+    :param game: The game object.
+    :param player: The player object.
+    :param schema: The compiled OffsetSchema.
+    """
+
+    def __init__(self, game, player, schema):
+        self.game = game
+        self.player = player
+        self.schema = schema
+        self.records = {}
+        self.pointers = {}
+        self.staged = []
+
+    def record_for(self, deref):
+        """
+        Get the shadow record a field with the given derefAddress lives in.
+
+        :param deref: The derefAddress of the field, or None for the player record.
+        :return: The ShadowRecord.
+        """
+        record = self.records.get(deref)
+        if record is None:
+            if deref is None:
+                address = self.player.address
+                length = self.schema.player_length
+            else:
+                # Take the pointer from the player record if it was already read
+                pointer_address = self.player.address + deref
+                player_record = self.records.get(None)
+                if player_record is not None:
+                    address = int.from_bytes(
+                        player_record.original[deref : deref + 8], byteorder="little"
+                    )
+                    if not address:
+                        raise ValueError(f"Null pointer at {hex(pointer_address)}")
+                else:
+                    address = ReadSubRecordAddress(self.game.memory, pointer_address)
+                self.pointers[pointer_address] = address
+                length = self.schema.sub_record_lengths[deref]
+            record = ShadowRecord(self.game.memory, address, length)
+            self.records[deref] = record
+        return record
+
+    def stage(self, field, value):
+        """
+        Stage a raw field value.
+
+        :param field: The FieldDescriptor of the field.
+        :param value: The raw integer value.
+        :return: None
+        """
+        self.record_for(field.deref).stage(field, value)
+        self.staged.append(field)
+
+    def holds(self, field, value):
+        """
+        Check if memory already holds a raw field value.
+
+        :param field: The FieldDescriptor of the field.
+        :param value: The raw integer value.
+        :return: True if the value is unchanged.
+        """
+        return field.extract(self.record_for(field.deref).original) == int(value)
+
+    def flush(self):
+        """
+        Write every staged change to memory.
+
+        :return: The number of writes made.
+        """
+        return sum(record.flush() for record in self.records.values())
+
+    def verify(self):
+        """
+        Read the staged fields back after a flush and check they hold what was written.
+
+        Each record with a staged field is read back once, however many fields
+        were staged to it.
+
+        :return: A list of (field, raw value written, raw value read) tuples for the mismatches.
+        """
+        mismatches = []
+        read_back = {}
+        for field in self.staged:
+            record = self.records[field.deref]
+            data = read_back.get(field.deref)
+            if data is None:
+                data = read_back[field.deref] = record.read_back()
+
+            # The local copy holds the last value staged to the field
+            expected = field.extract(record.record)
+            actual = field.extract(data)
+            if actual != expected:
+                mismatches.append((field, expected, actual))
+        return mismatches
@@ -0,0 +1,2 @@
+from benchmarks.fake_memory import *
+from benchmarks.suite import *
@@ -0,0 +1,52 @@
+import argparse
+
+import orjson
+from dribble.memory import GetOffsets
+
+from actions.offset_schema import OFFSETS_FILE, GetSchema
+from benchmarks.suite import BUILD_SIZES, IMPORT_SIZES, PrintResults, RunBenchmarks
+
+
+def ParseSizes(value):
+    return tuple(int(size) for size in value.split(",") if size.strip())
+
+
+def main():
+    """Run the benchmarks against a fake game: python -m benchmarks"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the player list build & import against a fake game."
+    )
+    parser.add_argument(
+        "--build-sizes",
+        type=ParseSizes,
+        default=BUILD_SIZES,
+        help="Comma separated table sizes to build the player list at.",
+    )
+    parser.add_argument(
+        "--import-sizes",
+        type=ParseSizes,
+        default=IMPORT_SIZES,
+        help="Comma separated player counts to import.",
+    )
+    parser.add_argument(
+        "--skip-startup",
+        action="store_true",
+        help="Don't benchmark the imports made before the first prompt.",
+    )
+    parser.add_argument("--json", help="Also save the results to this JSON file.")
+    args = parser.parse_args()
+
+    # Initialize offsets
+    GetOffsets(OFFSETS_FILE)
+    GetSchema()
+
+    results = RunBenchmarks(args.build_sizes, args.import_sizes, not args.skip_startup)
+    PrintResults(results)
+
+    if args.json:
+        with open(args.json, "wb") as f:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import random
+import struct
+from collections import Counter
+
+from dribble.utils import ConvertToGameValue
+from pymem.exception import MemoryReadError, MemoryWriteError
+
+from actions.offset_schema import GetSchema
+
+# Where the simulated memory starts
+FAKE_BASE_ADDRESS = 0x20000000
+
+# The number of teams players are spread over (the rest are free agents)
+FAKE_TEAM_COUNT = 30
+
+# Room for each player's first & last name (UTF-16, null terminated)
+FAKE_NAME_SIZE = 0x40
+
+FIRST_NAMES = ["Brent", "Jason", "LeBron", "José", "Luka", "Kevin", "Nikola", "Ja"]
+LAST_NAMES = ["George", "Archer", "James", "Calderón", "Dončić", "Durant", "Jokić", "Morant"]
+
+
+# A class to simulate the memory of the game process
+class FakeMemory(object):
+    """
+    An in-process stand-in for a pymem reader, backed by a byte buffer.
+
+    Every call is counted, along with the bytes read & written, so the cost of
+    an operation shows up as numbers.
+
+    :param base_address: The address the buffer starts at.
+    :param size: The size of the buffer in bytes.
+    """
+
+    def __init__(self, base_address, size):
+        self.base_address = base_address
+        self.buffer = bytearray(size)
+        self.calls = Counter()
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def counters(self):
+        """
+        Get the call & byte counters.
+
+        :return: A dictionary of reads, writes, bytes read & bytes written.
+        """
+        return {
+            "reads": sum(
+                count for name, count in self.calls.items() if name.startswith("read")
+            ),
+            "writes": self.calls["write_bytes"],
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+    def reset_counters(self):
+        """Reset the call & byte counters."""
+        self.calls = Counter()
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def _bytes(self, address, length):
+        start = address - self.base_address
+        if start < 0 or length < 0 or start + length > len(self.buffer):
+            raise MemoryReadError(address, length, "Address is outside the fake memory")
+        self.bytes_read += length
+        return bytes(self.buffer[start : start + length])
+
+    def read_bytes(self, address, length):
+        self.calls["read_bytes"] += 1
+        return self._bytes(address, length)
+
+    def write_bytes(self, address, value, length):
+        self.calls["write_bytes"] += 1
+        start = address - self.base_address
+        if start < 0 or start + length > len(self.buffer):
+            raise MemoryWriteError(address, value, "Address is outside the fake memory")
+        self.bytes_written += length
+        self.buffer[start : start + length] = value[:length]
+
+    def _read(self, name, fmt, address):
+        self.calls[name] += 1
+        return struct.unpack(fmt, self._bytes(address, struct.calcsize(fmt)))[0]
+
+    def read_bool(self, address):
+        return self._read("read_bool", "<?", address)
+
+    def read_uchar(self, address):
+        return self._read("read_uchar", "<B", address)
+
+    def read_short(self, address):
+        return self._read("read_short", "<h", address)
+
+    def read_ushort(self, address):
+        return self._read("read_ushort", "<H", address)
+
+    def read_int(self, address):
+        return self._read("read_int", "<i", address)
+
+    def read_uint(self, address):
+        return self._read("read_uint", "<I", address)
+
+    def read_longlong(self, address):
+        return self._read("read_longlong", "<q", address)
+
+    def read_ulonglong(self, address):
+        return self._read("read_ulonglong", "<Q", address)
+
+    def read_float(self, address):
+        return self._read("read_float", "<f", address)
+
+    def read_double(self, address):
+        return self._read("read_double", "<d", address)
+
+    def read_string(self, address, byte=50, encoding="UTF-8"):
+        self.calls["read_string"] += 1
+        data = self._bytes(address, byte)
+        end = data.find(b"\x00")
+        if end != -1:
+            data = data[:end]
+        return data.decode(encoding)
+
+    def write_pointer(self, address, value):
+        start = address - self.base_address
+        struct.pack_into("<Q", self.buffer, start, value)
+
+    def write_utf16(self, address, text, size):
+        start = address - self.base_address
+        self.buffer[start : start + size] = text.encode("utf-16-le").ljust(size, b"\0")[:size]
+
+
+# A class to stand in for the attached game
+class FakeGame(object):
+    """
+    A game object whose memory is a FakeMemory holding a synthetic player table.
+
+    :param memory: The FakeMemory.
+    :param module: The module base address the offsets are relative to.
+    """
+
+    def __init__(self, memory, module):
+        self.memory = memory
+        self.module = module
+
+
+def BuildFakeGame(player_count, duplicate_every=10, seed=0, slot_count=None):
+    """
+    Build a fake game holding a player table laid out per the loaded offsets.
+
+    Each player has a name, a team, random values for every field and its
+    Face & Body sub-records behind the 0x70 / 0x78 pointers. Every
+    duplicate_every-th player reuses an earlier name on another team, so
+    players have versions like in game.
+
+    :param player_count: The number of players in the table.
+    :param duplicate_every: How often a name is reused, 0 to never reuse one.
+    :param seed: The seed of the random values.
+    :param slot_count: The number of slots in the table, players fill the first
+        player_count of them & the rest are left empty. Defaults to player_count.
+    :return: The FakeGame.
+    """
+    schema = GetSchema()
+    base = schema.base
+    rng = random.Random(seed)
+    record_length = schema.player_length
+    team_length = schema.team_length
+    slot_count = max(slot_count or 0, player_count)
+
+    # Lay out the table, sub-records, teams & names one after the other
+    pointer_area = 0x1000
+    table_address = FAKE_BASE_ADDRESS + pointer_area
+    sub_record_addresses = {}
+    address = table_address + slot_count * record_length
+    for deref, length in sorted(schema.sub_record_lengths.items()):
+        sub_record_addresses[deref] = (address, length)
+        address += player_count * length
+    team_table_address = address
+    address += FAKE_TEAM_COUNT * team_length
+    names_address = address
+    address += player_count * 2 * FAKE_NAME_SIZE
+
+    memory = FakeMemory(FAKE_BASE_ADDRESS, address - FAKE_BASE_ADDRESS)
+    module = FAKE_BASE_ADDRESS + 0x100 - base["Player Base Address"]
+    memory.write_pointer(module + base["Player Base Address"], table_address)
+
+    # Name the teams
+    for team_index in range(FAKE_TEAM_COUNT):
+        team_address = team_table_address + team_index * team_length
+        memory.write_utf16(
+            team_address + base["Offset Player Team Name"], f"Team {team_index}", 0x40
+        )
+        memory.write_utf16(
+            team_address + base["Offset Player Team Short Name"], f"T{team_index:02}", 0x10
+        )
+
+    fields = [field for fields in schema.categories.values() for field in fields]
+    for slot in range(player_count):
+        player_address = table_address + slot * record_length
+
+        # Fill every field with a value that fits it
+        for field in fields:
+            if field.in_bytes:
+                value = int(ConvertToGameValue(rng.randint(25, 99), field.length))
+            else:
+                value = rng.getrandbits(field.length)
+            if field.deref is None:
+                field_base = player_address
+            else:
+                sub_address, length = sub_record_addresses[field.deref]
+                field_base = sub_address + slot * length
+            field.insert(memory.buffer, value, field_base - FAKE_BASE_ADDRESS)
+
+        # Point the player at its sub-records
+        for deref, (sub_address, length) in sub_record_addresses.items():
+            memory.write_pointer(player_address + deref, sub_address + slot * length)
+
+        # Name the player, reusing an earlier name now & then
+        name_slot = slot
+        if duplicate_every and slot and slot % duplicate_every == 0:
+            name_slot = rng.randrange(slot)
+        first_name = f"{FIRST_NAMES[name_slot % len(FIRST_NAMES)]}{name_slot}"
+        last_name = LAST_NAMES[name_slot % len(LAST_NAMES)]
+        first_address = names_address + slot * 2 * FAKE_NAME_SIZE
+        last_address = first_address + FAKE_NAME_SIZE
+        memory.write_utf16(first_address, first_name, FAKE_NAME_SIZE)
+        memory.write_utf16(last_address, last_name, FAKE_NAME_SIZE)
+        memory.write_pointer(player_address + base["Offset First Name"], first_address)
+        memory.write_pointer(player_address + base["Offset Last Name"], last_address)
+
+        # Put most players on a team, the rest are free agents
+        team_index = slot % (FAKE_TEAM_COUNT + 1)
+        team_address = (
+            team_table_address + team_index * team_length
+            if team_index < FAKE_TEAM_COUNT
+            else 0
+        )
+        memory.write_pointer(player_address + base["Offset Player Team"], team_address)
+
+    return FakeGame(memory, module)
@@ -0,0 +1,308 @@
+import contextlib
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from actions.build_player_list import BuildPlayerList
+from actions.export_writer import StreamExport
+from actions.import_sync_file import ImportSyncFile
+from actions.offset_schema import GetSchema
+from benchmarks.fake_memory import BuildFakeGame
+
+# The default sizes of the benchmarks
+BUILD_SIZES = (500, 10000, 30000)
+IMPORT_SIZES = (10, 500, 5000)
+
+# The (players, slots) of the sparse tables the list build is benchmarked at
+SPARSE_BUILD_SIZES = ((3000, 30000),)
+
+# The size of the player table imports are benchmarked against
+IMPORT_TABLE_SIZE = 10000
+
+# The number of values of each category changed per imported player
+IMPORT_VALUES_PER_CATEGORY = {"Attributes": 20, "Badges": 10, "Tendencies": 10, "Vitals": 2}
+
+# The size of the table the untimed warm-up import runs against
+IMPORT_WARMUP_TABLE_SIZE = 20
+
+# The number of times the startup imports are timed, the fastest run counts
+STARTUP_RUNS = 5
+
+# What the interactive program imports before its first prompt opens
+STARTUP_IMPORTS = "import main, ui"
+
+# Initialize the console for rich text output
+console = Console()
+
+
+def _Measure(operation, size, game, function):
+    """
+    Time a function and collect the memory counters of the fake game.
+
+    :param operation: The name of the operation.
+    :param size: The number of players the operation covers.
+    :param game: The FakeGame the operation runs against.
+    :param function: The function to time.
+    :return: A result dictionary.
+    """
+    game.memory.reset_counters()
+    start_time = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start_time
+
+    result = {"operation": operation, "size": size, "seconds": seconds}
+    result.update(game.memory.counters())
+    return result
+
+
+def BenchmarkListBuild(player_count, slot_count=None):
+    """
+    Benchmark building the player list from a fake player table.
+
+    :param player_count: The number of players in the table.
+    :param slot_count: The number of slots in the table, the rest are empty.
+        Defaults to player_count.
+    :return: A result dictionary.
+    """
+    game = BuildFakeGame(player_count, slot_count=slot_count)
+    exporter = BuildPlayerList(game, slot_count or player_count)
+    operation = f"build ({slot_count:,} slots)" if slot_count else "build"
+    return _Measure(operation, player_count, game, exporter.run)
+
+
+def BenchmarkStartup(runs=STARTUP_RUNS):
+    """
+    Benchmark the imports the program makes before its first prompt, each in a new interpreter.
+
+    The interpreter's own startup is measured separately and taken off.
+
+    :param runs: The number of runs, the fastest one is reported.
+    :return: A result dictionary, with the startup target.
+    """
+    from main import STARTUP_TARGET_SECONDS
+
+    def fastest(code):
+        timings = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            timings.append(time.perf_counter() - start_time)
+        return min(timings)
+
+    seconds = max(fastest(STARTUP_IMPORTS) - fastest("pass"), 0.0)
+    return {
+        "operation": "startup imports",
+        "size": 0,
+        "seconds": seconds,
+        "target_seconds": STARTUP_TARGET_SECONDS,
+        "reads": 0,
+        "writes": 0,
+        "bytes_read": 0,
+        "bytes_written": 0,
+    }
+
+
+def BenchmarkFindPlayer(player_count, lookups=1000):
+    """
+    Benchmark finding players by name in a built player list.
+
+    :param player_count: The number of players in the table.
+    :param lookups: The number of names looked up.
+    :return: A result dictionary.
+    """
+    game = BuildFakeGame(player_count)
+    exporter = BuildPlayerList(game, player_count)
+    exporter.run()
+    exporter.find_versions()
+
+    names = random.Random(0).choices(list(exporter.store), k=lookups)
+
+    def find():
+        for name in names:
+            exporter.find_player_by_name(name)
+
+    return _Measure("find_player_by_name", lookups, game, find)
+
+
+def BenchmarkExport(player_count, categories=("Attributes",)):
+    """
+    Benchmark exporting a few categories of a built player list, with the selection pushed down.
+
+    :param player_count: The number of players in the table.
+    :param categories: The categories selected for export, with all of their items.
+    :return: A result dictionary.
+    """
+    game = BuildFakeGame(player_count)
+    exporter = BuildPlayerList(game, player_count)
+    exporter.run()
+
+    schema = GetSchema()
+    export_selections = {
+        category: [field.name for field in schema.categories[category]]
+        for category in categories
+    }
+
+    with tempfile.TemporaryDirectory() as export_dir:
+        export_path = os.path.join(export_dir, "export.json")
+        return _Measure(
+            f"export ({', '.join(categories)})",
+            player_count,
+            game,
+            lambda: StreamExport(exporter.project_players(export_selections), export_path),
+        )
+
+
+def BuildImportData(exporter, player_count, seed=0):
+    """
+    Build import data changing values of players in a player list.
+
+    :param exporter: The BuildPlayerList holding the player list.
+    :param player_count: The number of players to import.
+    :param seed: The seed of the random values.
+    :return: A dictionary of player name -> data by category.
+    """
+    schema = GetSchema()
+    rng = random.Random(seed)
+    data = {}
+    for name in list(exporter.store)[:player_count]:
+        player_data = {}
+        for category, value_count in IMPORT_VALUES_PER_CATEGORY.items():
+            fields = [
+                field
+                for field in schema.categories.get(category, [])
+                if field.length <= 16
+            ][:value_count]
+            player_data[category] = {
+                field.name: rng.randint(25, 99)
+                if field.in_bytes
+                else rng.getrandbits(field.length)
+                for field in fields
+            }
+        data[name] = player_data
+    return data
+
+
+@contextlib.contextmanager
+def _TemporaryWorkingDirectory():
+    """
+    Run in a temporary working directory, so the import log & reports don't touch the repo.
+
+    :return: A context manager yielding the directory.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as working_dir:
+        os.makedirs(os.path.join(working_dir, "configs", "logs"))
+        os.chdir(working_dir)
+        try:
+            yield working_dir
+        finally:
+            os.chdir(cwd)
+
+
+def BenchmarkImport(player_count, table_size=IMPORT_TABLE_SIZE):
+    """
+    Benchmark importing players into a fake player table.
+
+    A small untimed import runs first, so the measured one doesn't pay for
+    first-use costs like the lazily imported prompts.
+
+    :param player_count: The number of players to import.
+    :param table_size: The number of players in the table.
+    :return: A result dictionary.
+    """
+    game = BuildFakeGame(max(table_size, player_count))
+    exporter = BuildPlayerList(game, max(table_size, player_count))
+    exporter.run()
+    data = BuildImportData(exporter, player_count)
+
+    warmup_game = BuildFakeGame(IMPORT_WARMUP_TABLE_SIZE)
+    warmup_exporter = BuildPlayerList(warmup_game, IMPORT_WARMUP_TABLE_SIZE)
+    warmup_exporter.run()
+    warmup_data = BuildImportData(warmup_exporter, 1)
+
+    with _TemporaryWorkingDirectory():
+        ImportSyncFile(
+            warmup_game, warmup_exporter, warmup_data, import_all_versions=True
+        ).run()
+
+        importer = ImportSyncFile(game, exporter, data, import_all_versions=True)
+        return _Measure("import", player_count, game, importer.run)
+
+
+def RunBenchmarks(
+    build_sizes=BUILD_SIZES,
+    import_sizes=IMPORT_SIZES,
+    startup=True,
+    sparse_build_sizes=SPARSE_BUILD_SIZES,
+):
+    """
+    Run every benchmark.
+
+    :param build_sizes: The table sizes the list build is benchmarked at.
+    :param sparse_build_sizes: The (players, slots) of sparse tables the list build is benchmarked at.
+    :param import_sizes: The player counts imports are benchmarked at.
+    :param startup: Whether to benchmark the startup imports.
+    :return: A list of result dictionaries.
+    """
+    results = []
+    if startup:
+        results.append(BenchmarkStartup())
+    for player_count in build_sizes:
+        results.append(BenchmarkListBuild(player_count))
+    for player_count, slot_count in sparse_build_sizes:
+        results.append(BenchmarkListBuild(player_count, slot_count))
+    if build_sizes:
+        results.append(BenchmarkFindPlayer(max(build_sizes)))
+        results.append(BenchmarkExport(max(build_sizes)))
+    for player_count in import_sizes:
+        results.append(BenchmarkImport(player_count))
+    return results
+
+
+def PrintResults(results):
+    """
+    Print benchmark results as a table.
+
+    :param results: A list of result dictionaries.
+    :return: None
+    """
+    table = Table(title="Benchmarks")
+    for column in (
+        "Operation",
+        "Players",
+        "Seconds",
+        "ms / player",
+        "Reads",
+        "Writes",
+        "Bytes read",
+        "Bytes written",
+    ):
+        table.add_column(column, justify="left" if column == "Operation" else "right")
+
+    for result in results:
+        table.add_row(
+            result["operation"],
+            f"{result['size']:,}",
+            f"{result['seconds']:.3f}",
+            f"{result['seconds'] * 1000 / result['size']:.3f}" if result["size"] else "-",
+            f"{result['reads']:,}",
+            f"{result['writes']:,}",
+            f"{result['bytes_read']:,}",
+            f"{result['bytes_written']:,}",
+        )
+    console.print(table)
+
+    # Flag a startup slower than its target
+    for result in results:
+        target = result.get("target_seconds")
+        if target is not None and result["seconds"] > target:
+            console.print(
+                f"[red]{result['operation']} took {result['seconds']:.3f}s, "
+                f"over the {target:.3f}s target.[/red]"
+            )
@@ -1,4 +1,11 @@
+import time
+
+# When the program started, to measure the time until the first prompt opens
+PROGRAM_START = time.perf_counter()
+
+import argparse
 import os
+import sys
 
 from dribble.memory import GetOffsets
 from dribble.models import Game
@@ -8,11 +15,16 @@ from rich.console import Console
 from rich.panel import Panel
 
 from actions.build_player_list import BuildPlayerList
-from ui import run_cli
+from actions.instrumentation import EnableInstrumentationFromEnvironment
+from actions.offset_schema import OFFSETS_FILE, GetSchema
+from actions.version_policy import VERSION_POLICIES
 
 # Setup rich console
 console = Console()
 
+# How long the program may take to open the first prompt, in seconds
+STARTUP_TARGET_SECONDS = 1.0
+
 
 def ClearConsole():
     """Clear the console window."""
@@ -33,24 +45,43 @@ def StartProgram():
 
         # Initialize offsets
         try:
-            GetOffsets("resources/offsets.json")
+            GetOffsets(OFFSETS_FILE)
+            GetSchema()
         except ValueError as e:
             print(f"\n[red]Failed to load offsets: {e}[/red]\n")
             return
 
-        # Ask how many players to show
-        player_list_size = 10000
-
         # Initialize the game connection
         game = Game()
-        exporter = BuildPlayerList(game, player_list_size)
-        exporter.run()
 
         # Check if the game module is valid
         if not game.module:
             print("\n[red]Could not attach to the process.[/red]\n")
             return
 
+        # Record memory calls & phase timings if DRIBBLE_METRICS is set
+        instrumentation = EnableInstrumentationFromEnvironment()
+        if instrumentation is not None:
+            game.memory = instrumentation.wrap_memory(game.memory)
+
+        # Build the player list in the background while the file prompt is open,
+        # the importer waits for it once a file is picked
+        exporter = BuildPlayerList(game)
+        exporter.start_background()
+
+        # The prompts load InquirerPy, so they're imported while the list builds
+        from ui import run_cli
+
+        # Record how long it took to get to the first prompt
+        startup_seconds = time.perf_counter() - PROGRAM_START
+        if instrumentation is not None:
+            instrumentation.record_phase("startup", startup_seconds)
+        if startup_seconds > STARTUP_TARGET_SECONDS:
+            console.print(
+                f"[yellow]Startup took {startup_seconds:.2f}s "
+                f"(target {STARTUP_TARGET_SECONDS:.2f}s).[/yellow]"
+            )
+
         # Game loop
         while True:
             run_cli(game, exporter)
@@ -68,5 +99,253 @@ def StartProgram():
         input("\nPress Enter to exit...\n")
 
 
+def ParseArguments(argv=None):
+    """
+    Parse the command line, which only has options for headless runs.
+
+    :param argv: The arguments, sys.argv by default.
+    :return: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Dribble Upgrader. Without import files, the interactive upgrader starts."
+    )
+    parser.add_argument(
+        "import_files",
+        nargs="*",
+        help="Import files (.json, .jsonl or 'api') to import in order, without any prompt.",
+    )
+    parser.add_argument(
+        "--versions",
+        choices=VERSION_POLICIES,
+        default="first",
+        help="Which versions of a player with duplicates to import to (default: first).",
+    )
+    parser.add_argument(
+        "--teams",
+        default="",
+        help="Comma separated team Keys used by --versions team.",
+    )
+    parser.add_argument(
+        "--overrides",
+        help="A JSON file of player name -> \"first\", \"all\" or a list of team Keys / addresses.",
+    )
+    parser.add_argument(
+        "--skip-unchanged",
+        action="store_true",
+        help="Skip values the player list already holds.",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="Merge the import files into one import, the last file to set a value wins.",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Read each player back after writing it and log values that didn't stick.",
+    )
+    parser.add_argument(
+        "--save-snapshot",
+        metavar="SNAPSHOT",
+        help="Save the player table to a snapshot file after the imports (or right away without import files).",
+    )
+    parser.add_argument(
+        "--export-snapshot",
+        nargs=2,
+        metavar=("SNAPSHOT", "EXPORT"),
+        help="Export every player of a snapshot file to a .json or .jsonl file, without the game.",
+    )
+    parser.add_argument(
+        "--diff-snapshots",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Print what changed between two snapshot files, without the game.",
+    )
+    return parser.parse_args(argv)
+
+
+def RunBatchImport(args):
+    """
+    Import files without any interactive prompt.
+
+    :param args: The parsed command line arguments.
+    :return: The exit code.
+    """
+    # Only a headless run needs these up front
+    from actions.import_sync_file import ImportSyncFile
+    from actions.load_import_file import LoadImportFile
+    from actions.merge_import import MergedImport
+    from actions.version_policy import VersionPolicy
+
+    try:
+        # Initialize offsets & the version policy
+        GetOffsets(OFFSETS_FILE)
+        GetSchema()
+        team_keys = [key.strip() for key in args.teams.split(",") if key.strip()]
+        version_policy = VersionPolicy.from_override_file(
+            args.versions, team_keys, args.overrides
+        )
+    except (OSError, ValueError) as e:
+        print(f"\n[red]Failed to start the import: {e}[/red]\n")
+        return 2
+
+    try:
+        # Initialize the game connection
+        game = Game()
+        if not game.module:
+            print("\n[red]Could not attach to the process.[/red]\n")
+            return 1
+
+        # Record memory calls & phase timings if DRIBBLE_METRICS is set
+        instrumentation = EnableInstrumentationFromEnvironment()
+        if instrumentation is not None:
+            game.memory = instrumentation.wrap_memory(game.memory)
+
+        exporter = BuildPlayerList(game)
+        exporter.run()
+
+        # Each import is (label, data, source path for the plan cache, value source logs)
+        if args.merge and len(args.import_files) > 1:
+            console.print(f"\n[cyan]Merging {len(args.import_files)} import files...[/cyan]")
+            merged_import = MergedImport(args.import_files)
+            merged_import.load()
+            imports = [
+                (
+                    " + ".join(args.import_files),
+                    merged_import.items(),
+                    None,
+                    merged_import.source_logs(),
+                )
+            ]
+        else:
+            imports = [
+                (import_file_path, None, import_file_path, None)
+                for import_file_path in args.import_files
+            ]
+
+        # Any import that doesn't fully succeed fails the run, the rest still go ahead
+        exit_code = 0
+        for index, (label, import_data, source_path, source_logs) in enumerate(imports):
+            console.print(f"\n[cyan]Importing {label}...[/cyan]")
+            if import_data is None:
+                import_data = LoadImportFile(source_path).iter_file()
+
+            # The previous import changed the game, so bring the player list up to date
+            if index:
+                exporter.refresh()
+
+            importer = ImportSyncFile(
+                game,
+                exporter,
+                import_data,
+                args.skip_unchanged,
+                source_path,
+                version_policy=version_policy,
+                verify=args.verify,
+                source_logs=source_logs,
+            )
+            if not importer.run():
+                exit_code = 1
+
+            written = sum(count["written"] for count in importer.counts.values())
+            failed = sum(count["failed"] for count in importer.counts.values())
+            console.print(
+                f"[cyan]{label}: {written} values written, {failed} failed, "
+                f"{len(importer.players_not_found)} players not found.[/cyan]"
+            )
+            if args.verify and importer.verify_counts["mismatched"]:
+                console.print(
+                    f"[yellow]{importer.verify_counts['mismatched']} values didn't read back "
+                    f"as written, see the import log.[/yellow]"
+                )
+            if args.verify and importer.verify_counts["unreadable"]:
+                console.print(
+                    f"[yellow]{importer.verify_counts['unreadable']} values couldn't be read back, "
+                    f"see the import log.[/yellow]"
+                )
+            if importer.error is not None:
+                console.print(f"[red]{label} stopped by an error: {importer.error}[/red]")
+
+        # Save the table as the imports left it
+        if args.save_snapshot:
+            from actions.player_snapshot import SavePlayerSnapshot
+
+            if imports:
+                exporter.refresh()
+            player_count = SavePlayerSnapshot(exporter, args.save_snapshot)
+            console.print(
+                f"\n[cyan]Saved {player_count} players to {args.save_snapshot}.[/cyan]"
+            )
+
+    except ProcessNotFound:
+        print("\n[red]Could not find the process.[/red]\n")
+        return 1
+    except MemoryReadError:
+        print("\n[red]Could not read memory.[/red]\n")
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"\n[red]Import failed: {e}[/red]\n")
+        return 1
+
+    return exit_code
+
+
+def RunSnapshotCommand(args):
+    """
+    Export or compare snapshot files, without the game.
+
+    :param args: The parsed command line arguments.
+    :return: The exit code.
+    """
+    from actions.export_writer import StreamExport
+    from actions.player_snapshot import DiffSnapshots, PlayerSnapshot
+
+    try:
+        if args.export_snapshot:
+            snapshot_path, export_path = args.export_snapshot
+            export_format = "jsonl" if export_path.endswith(".jsonl") else "json"
+            with PlayerSnapshot(snapshot_path) as snapshot:
+                player_count, _, seconds = StreamExport(
+                    snapshot.items(), export_path, None, export_format
+                )
+            console.print(
+                f"\n[green]Exported {player_count} players to {export_path} in {seconds:.2f}s.[/green]"
+            )
+
+        if args.diff_snapshots:
+            old_path, new_path = args.diff_snapshots
+            with PlayerSnapshot(old_path) as old, PlayerSnapshot(new_path) as new:
+                report = DiffSnapshots(old, new)
+            console.print(
+                f"\n[cyan]{len(report['added'])} added, {len(report['removed'])} removed, "
+                f"{len(report['changed'])} changed.[/cyan]"
+            )
+            for name in report["added"]:
+                console.print(f"+ {name}", markup=False)
+            for name in report["removed"]:
+                console.print(f"- {name}", markup=False)
+            for name, changes in report["changed"].items():
+                fields = []
+                for category, values in changes.items():
+                    if category == "Team":
+                        old_team, new_team = values
+                        fields.append(f"Team {old_team.get('Key')} -> {new_team.get('Key')}")
+                        continue
+                    for field_name, (old_value, new_value) in values.items():
+                        fields.append(f"{field_name} {old_value} -> {new_value}")
+                console.print(f"~ {name}: {', '.join(fields)}", markup=False)
+
+    except (OSError, ValueError) as e:
+        print(f"\n[red]Snapshot command failed: {e}[/red]\n")
+        return 1
+
+    return 0
+
+
 if __name__ == "__main__":
+    arguments = ParseArguments()
+    if arguments.export_snapshot or arguments.diff_snapshots:
+        sys.exit(RunSnapshotCommand(arguments))
+    if arguments.import_files or arguments.save_snapshot:
+        sys.exit(RunBatchImport(arguments))
     StartProgram()
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+# Run the tests against the repo checkout, from wherever pytest is started
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def offsets(monkeypatch):
+    """Load the repo's offsets file, which the schema & the fake game are built from."""
+    from dribble.memory import GetOffsets
+
+    from actions.offset_schema import OFFSETS_FILE
+
+    monkeypatch.chdir(REPO_ROOT)
+    return GetOffsets(OFFSETS_FILE)
+
+
+@pytest.fixture
+def import_tree(offsets, monkeypatch, tmp_path):
+    """Run in a scratch tree with the offsets file, so import logs & plans stay out of the repo."""
+    import shutil
+
+    os.makedirs(tmp_path / "configs" / "logs")
+    os.makedirs(tmp_path / "resources")
+    shutil.copy(os.path.join(REPO_ROOT, "resources", "offsets.json"), tmp_path / "resources")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,169 @@
+import gzip
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from actions.api_cache import ApiResponseCache
+
+# The body every endpoint of the stand-in serves
+BODY = b'{"Brent George": {"Attributes": {"Block": 90}}}' * 64
+
+ETAG = '"players-v1"'
+LAST_MODIFIED = formatdate(0, usegmt=True)
+
+
+# A class to stand in for the Dribble API
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Serves BODY on a few paths, each with a different encoding & validator:
+
+    /gzip   gzip encoded, revalidated with an ETag
+    /br     brotli encoded, revalidated with Last-Modified
+    /plain  no encoding & no validators
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        if self.path == "/gzip":
+            if self.headers.get("If-None-Match") == ETAG:
+                return self.send_not_modified()
+            self.send_body(gzip.compress(BODY), "gzip", {"ETag": ETAG})
+        elif self.path == "/br":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self.send_not_modified()
+            import brotli
+
+            self.send_body(brotli.compress(BODY), "br", {"Last-Modified": LAST_MODIFIED})
+        elif self.path == "/plain":
+            self.send_body(BODY, None, {})
+        else:
+            self.send_error(404)
+
+    def send_not_modified(self):
+        self.server.not_modified += 1
+        self.send_response(304)
+        self.end_headers()
+
+    def send_body(self, data, encoding, headers):
+        accepted = self.headers.get("Accept-Encoding", "")
+        if encoding is not None and encoding not in accepted:
+            self.send_error(406)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def api_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    server.requests = []
+    server.not_modified = 0
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _Url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def _Fetch(cache, url):
+    return b"".join(cache.iter_chunks(url))
+
+
+def test_gzip_response_is_decoded_and_cached(api_server, tmp_path):
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/gzip")
+
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 200
+    assert "gzip" in api_server.requests[0][1]["Accept-Encoding"]
+
+    body_path, meta_path = cache.paths(url)
+    with open(body_path, "rb") as f:
+        assert f.read() == BODY
+    assert cache.read_meta(url)["etag"] == ETAG
+
+
+def test_brotli_response_is_decoded_and_cached(api_server, tmp_path):
+    pytest.importorskip("brotli")
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/br")
+
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 200
+    assert cache.read_meta(url)["last_modified"] == LAST_MODIFIED
+
+
+def test_etag_revalidation_reads_the_cached_body(api_server, tmp_path):
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/gzip")
+    _Fetch(cache, url)
+
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 304
+    assert api_server.not_modified == 1
+    assert api_server.requests[1][1]["If-None-Match"] == ETAG
+
+
+def test_last_modified_revalidation_reads_the_cached_body(api_server, tmp_path):
+    pytest.importorskip("brotli")
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/br")
+    _Fetch(cache, url)
+
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 304
+    assert api_server.not_modified == 1
+    assert api_server.requests[1][1]["If-Modified-Since"] == LAST_MODIFIED
+    assert "If-None-Match" not in api_server.requests[1][1]
+
+
+def test_response_without_validators_is_not_cached(api_server, tmp_path):
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/plain")
+
+    assert _Fetch(cache, url) == BODY
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 200
+    assert api_server.not_modified == 0
+    assert "If-None-Match" not in api_server.requests[1][1]
+    assert "If-Modified-Since" not in api_server.requests[1][1]
+    assert cache.read_meta(url) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stale_cache_is_replaced_by_a_changed_body(api_server, tmp_path):
+    cache = ApiResponseCache(str(tmp_path))
+    url = _Url(api_server, "/gzip")
+    body_path, meta_path = cache.paths(url)
+
+    # A cached body with an old ETag gets the full response again
+    with open(body_path, "wb") as f:
+        f.write(b"{}")
+    with open(meta_path, "wb") as f:
+        f.write(b'{"etag": "\\"players-v0\\"", "last_modified": null}')
+
+    assert _Fetch(cache, url) == BODY
+    assert cache.last_status == 200
+    with open(body_path, "rb") as f:
+        assert f.read() == BODY
@@ -0,0 +1,245 @@
+import pytest
+
+pytest.importorskip("dribble")
+
+from pymem.exception import MemoryReadError
+
+from actions.build_player_list import (
+    MAX_PLAYER_SLOTS,
+    BuildPlayerList,
+    BuildSlot,
+    FindPlayerSlots,
+    ReadableSlots,
+)
+from benchmarks.fake_memory import BuildFakeGame
+
+
+@pytest.mark.parametrize("player_count", [300, 2000])
+def test_default_limit_finds_every_player_of_a_smaller_table(offsets, player_count):
+    # The sub-records, teams & names follow the table, then the memory ends
+    game = BuildFakeGame(player_count)
+    exporter = BuildPlayerList(game)
+    assert exporter.slot_limit == MAX_PLAYER_SLOTS
+
+    exporter.run(quiet=True)
+
+    assert len(exporter.player_list) == player_count
+    assert exporter.player_list_size == player_count
+    assert sorted(exporter.slot_rows) == list(range(player_count))
+
+
+def test_sparse_table_stops_at_the_last_player(offsets):
+    game = BuildFakeGame(300, slot_count=3000)
+    exporter = BuildPlayerList(game)
+
+    exporter.run(quiet=True)
+
+    assert len(exporter.player_list) == 300
+    assert exporter.player_list_size == 300
+
+
+def test_find_player_slots_skips_pointers_that_are_not_addresses():
+    record_length = 0x10
+    records = [
+        (0x20000000, 0x20000040),  # A player
+        (0, 0x20000080),  # A player without a first name
+        (0, 0),  # An empty slot
+        (0x0065006E00720042, 0x20000100),  # Text, not a pointer
+        (0x20000140, 0x20000180),  # A player after a gap
+    ]
+    table = b"".join(
+        first.to_bytes(8, "little") + last.to_bytes(8, "little") for first, last in records
+    )
+
+    assert FindPlayerSlots(table, record_length, (0, 8)) == [0, 1, 4]
+    assert FindPlayerSlots(table, record_length, (0, 8), start=1) == [1, 4]
+
+
+def test_find_player_slots_ends_the_table_at_a_run_of_empty_slots():
+    record_length = 0x10
+    player = (0x20000000).to_bytes(8, "little") * 2
+    empty = bytes(record_length)
+    table = player * 3 + empty * 4 + player + empty * 8 + player
+
+    assert FindPlayerSlots(table, record_length, (0, 8), empty_run=8) == [0, 1, 2, 7]
+    assert FindPlayerSlots(table, record_length, (0, 8), empty_run=9) == [0, 1, 2, 7, 16]
+
+
+def test_readable_slots_drops_names_that_lead_nowhere():
+    class Memory(object):
+        # Memory from 0x20000000 up to 0x20002000
+        reads = 0
+
+        def read_bytes(self, address, length):
+            self.reads += 1
+            if not 0x20000000 <= address < 0x20002000:
+                raise MemoryReadError(address, length)
+            return bytes(length)
+
+    record_length = 0x10
+    records = [
+        (0x20000000, 0x20000040),
+        (0x20000080, 0xD400000000),  # Past the table, a pointer into nothing
+        (0, 0x20001000),
+        (0xD400000000, 0xD400000040),
+    ]
+    table = b"".join(
+        first.to_bytes(8, "little") + last.to_bytes(8, "little") for first, last in records
+    )
+    memory = Memory()
+
+    assert ReadableSlots(memory, table, record_length, (0, 8), [0, 1, 2, 3]) == [0, 2]
+    # One read per page
+    assert memory.reads == 3
+
+
+def test_a_slot_that_can_not_be_read_is_an_error(offsets):
+    game = BuildFakeGame(10)
+
+    assert BuildSlot(game, 0) is not None
+    with pytest.raises(MemoryReadError):
+        BuildSlot(game, 100000)
+
+
+def _ExportSelections(exporter):
+    # Every Attribute, a few items of each other category & a category no export holds
+    selections = {
+        category: list(columns)[:3] for category, columns in exporter.store.columns.items()
+    }
+    selections["Attributes"] = list(exporter.store.columns["Attributes"])
+    selections["Face"] = ["Face ID"]
+    return selections
+
+
+def test_projected_export_matches_the_full_export(offsets):
+    from actions.export_writer import ExportPlayerData
+
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    selections = _ExportSelections(exporter)
+
+    expected = {
+        name: ExportPlayerData(data, selections) for name, data in exporter.store.items()
+    }
+    projected = dict(exporter.project_players(selections))
+
+    assert projected == expected
+    assert list(next(iter(projected.values()))) == list(next(iter(expected.values())))
+
+
+def test_projected_export_keeps_each_players_values_with_its_name(offsets):
+    from actions.export_writer import ExportPlayerData
+    from actions.offset_schema import GetSchema
+
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    selections = _ExportSelections(exporter)
+    expected = {
+        name: ExportPlayerData(data, selections) for name, data in exporter.store.items()
+    }
+
+    # Copy the record of slot 1 over slot 0 after the list was read
+    record_length = GetSchema().player_length
+    first, second = exporter.player_list[0], exporter.player_list[1]
+    game.memory.write_bytes(
+        first.address, game.memory.read_bytes(second.address, record_length), record_length
+    )
+
+    assert dict(exporter.project_players(selections)) == expected
+
+
+def test_projected_export_without_a_table_reads_the_player_list(offsets):
+    from actions.export_writer import ExportPlayerData
+
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    selections = _ExportSelections(exporter)
+    exporter.table_address = None
+
+    assert dict(exporter.project_players(selections)) == {
+        name: ExportPlayerData(data, selections) for name, data in exporter.store.items()
+    }
+
+
+def test_export_of_a_new_list_decodes_the_scanned_table(offsets, monkeypatch, tmp_path):
+    import orjson
+
+    from actions.export_writer import ExportPlayerData
+
+    game = BuildFakeGame(300)
+    full = BuildPlayerList(game)
+    full.run(quiet=True)
+    selections = _ExportSelections(full)
+
+    (tmp_path / "configs" / "exports").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "projected")
+
+    game.memory.reset_counters()
+    BuildPlayerList(game).run(quiet=True)
+    build_reads = game.memory.counters()["reads"]
+
+    game.memory.reset_counters()
+    BuildPlayerList(game).run(export=True, export_selections=selections, quiet=True)
+
+    # The table is read once, by the scan
+    assert game.memory.counters()["reads"] == build_reads
+    with open(tmp_path / "configs" / "exports" / "projected.json", "rb") as f:
+        exported = orjson.loads(f.read())
+    assert exported == {
+        name: ExportPlayerData(data, selections) for name, data in full.store.items()
+    }
+
+
+def test_refresh_relabels_the_version_of_a_traded_player(offsets):
+    from actions.offset_schema import GetSchema
+
+    schema = GetSchema()
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    exporter.find_versions()
+
+    # Move a player whose name is unique onto the team of another player
+    player = next(
+        view
+        for view in exporter.player_list
+        if len(exporter.versions[f"{view.vitals['First Name']} {view.vitals['Last Name']}"]) == 1
+    )
+    other = next(view for view in exporter.player_list if view.team["Key"] != player.team["Key"])
+    team_offset = schema.base["Offset Player Team"]
+    team_pointer = int.from_bytes(game.memory.read_bytes(other.address + team_offset, 8), "little")
+    game.memory.write_pointer(player.address + team_offset, team_pointer)
+
+    report = exporter.refresh()
+
+    full_name = f"{player.vitals['First Name']} {player.vitals['Last Name']}"
+    assert player.name in report["changed"]
+    assert list(exporter.versions[full_name]) == [f"{full_name} on {other.team['Key']}"]
+
+
+def test_fingerprint_changes_when_a_player_changes_team(offsets):
+    from actions.offset_schema import GetSchema
+
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    fingerprint = exporter.fingerprint()
+
+    # Values don't change the fingerprint
+    block = GetSchema().field("Attributes", "Block")
+    player = exporter.player_list[0]
+    game.memory.write_bytes(player.address + block.offset, b"\x01", 1)
+    exporter.refresh()
+    assert exporter.fingerprint() == fingerprint
+
+    # A trade does
+    other = next(view for view in exporter.player_list if view.team["Key"] != player.team["Key"])
+    team_offset = GetSchema().base["Offset Player Team"]
+    team_pointer = game.memory.read_bytes(other.address + team_offset, 8)
+    game.memory.write_bytes(player.address + team_offset, team_pointer, 8)
+    exporter.refresh()
+    assert exporter.fingerprint() != fingerprint
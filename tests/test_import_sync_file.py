@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+pytest.importorskip("dribble")
+
+from actions.build_player_list import BuildPlayerList
+from actions.import_sync_file import ImportSyncFile
+from actions.load_import_file import IterJsonObjectItems
+from actions.write_coalescer import PlayerWriteTransaction
+from benchmarks.fake_memory import BuildFakeGame
+
+
+@pytest.fixture
+def exporter(import_tree):
+    exporter = BuildPlayerList(BuildFakeGame(100))
+    exporter.run(quiet=True)
+    return exporter
+
+
+def _PlayerName(exporter):
+    # A player with one version, so each value is written once
+    return next(
+        view.name
+        for view in exporter.player_list
+        if len(exporter.find_versions()[f"{view.vitals['First Name']} {view.vitals['Last Name']}"]) == 1
+    )
+
+
+def _Import(exporter, data, **options):
+    importer = ImportSyncFile(
+        exporter.game, exporter, data, import_all_versions=True, **options
+    )
+    return importer, importer.run()
+
+
+def test_an_import_that_writes_every_value_succeeds(exporter):
+    name = _PlayerName(exporter)
+    importer, succeeded = _Import(exporter, {name: {"Attributes": {"Block": 80}}}, verify=True)
+
+    assert succeeded and importer.succeeded
+    assert importer.counts["Attributes"]["written"] == 1
+    assert importer.verify_counts == {"checked": 1, "mismatched": 0, "unreadable": 0}
+
+
+def test_a_value_that_fails_fails_the_import(exporter):
+    name = _PlayerName(exporter)
+    importer, succeeded = _Import(exporter, {name: {"Attributes": {"No Such Rating": 80}}})
+
+    assert not succeeded
+    assert importer.counts["Attributes"]["failed"] == 1
+    assert importer.error is None
+
+
+def test_values_are_counted_once_per_version(exporter):
+    name = next(
+        f"{view.vitals['First Name']} {view.vitals['Last Name']}"
+        for view in exporter.player_list
+        if len(exporter.find_versions()[f"{view.vitals['First Name']} {view.vitals['Last Name']}"]) == 2
+    )
+    importer, succeeded = _Import(
+        exporter, {name: {"Attributes": {"Block": 80, "No Such Rating": 80}}}
+    )
+
+    assert not succeeded
+    assert importer.counts["Attributes"]["written"] == 2
+    assert importer.counts["Attributes"]["failed"] == 2
+    assert sum("No Such Rating" in log for log in importer.logs) == 2
+
+
+def test_a_malformed_streamed_file_fails_the_import(exporter):
+    name = _PlayerName(exporter)
+    chunks = [json.dumps({name: {"Attributes": {"Block": 80}}})[:-1].encode() + b", oops}"]
+    importer, succeeded = _Import(exporter, IterJsonObjectItems(chunks))
+
+    assert not succeeded
+    assert isinstance(importer.error, ValueError)
+    with open("configs/logs/import_log.txt") as f:
+        assert "Import stopped by an error" in f.read()
+
+
+def test_a_failed_read_back_is_not_counted_as_verified(exporter, monkeypatch):
+    def verify(transaction):
+        raise OSError("Could not read memory")
+
+    monkeypatch.setattr(PlayerWriteTransaction, "verify", verify)
+    name = _PlayerName(exporter)
+    importer, succeeded = _Import(
+        exporter, {name: {"Attributes": {"Block": 80, "Close Shot": 81}}}, verify=True
+    )
+
+    assert not succeeded
+    assert importer.verify_counts == {"checked": 0, "mismatched": 0, "unreadable": 2}
+
+
+def test_each_player_is_written_in_one_timed_flush(exporter, monkeypatch):
+    from actions import instrumentation
+
+    metrics = instrumentation.Instrumentation()
+    monkeypatch.setattr(instrumentation, "_instrumentation", metrics)
+    name = _PlayerName(exporter)
+    _Import(
+        exporter,
+        {name: {"Attributes": {"Block": 80}, "Tendencies": {"Contested Jumper Mid": 70}}},
+    )
+
+    # The categories are staged separately, then written together
+    assert metrics.phases[("stage", "Attributes")][0] == 1
+    assert metrics.phases[("stage", "Tendencies")][0] == 1
+    assert metrics.phases[("write", None)][0] == 1
+    assert not [label for phase, label in metrics.phases if phase == "write" and label]
+
+
+def test_headless_import_exits_non_zero_when_an_import_fails(exporter, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "Game", lambda: exporter.game)
+    name = _PlayerName(exporter)
+    with open("good.json", "w") as f:
+        json.dump({name: {"Attributes": {"Block": 80}}}, f)
+    with open("bad.json", "w") as f:
+        f.write(json.dumps({name: {"Attributes": {"Block": 81}}}) + " trailing")
+
+    assert main.RunBatchImport(main.ParseArguments(["good.json"])) == 0
+    assert main.RunBatchImport(main.ParseArguments(["bad.json", "good.json"])) == 1
@@ -0,0 +1,102 @@
+import json
+import random
+
+import pytest
+
+from actions.load_import_file import IterJsonObjectItems, LoadImportFile
+
+DOCUMENTS = [
+    "{}",
+    " \n{ } \n",
+    '{"a":1e-05}',
+    '{"a": -12.5E+3, "b": 0, "c": 123456789012345678901234567890}',
+    '{"a": true, "b": false, "c": null}',
+    '{"Luka Dončić": {"Attributes": {"Block": 70}, "Vitals": {"Position": "C"}}}',
+    '{"a": "quote \\" and \\\\ backslash \\u00e9 \\ud83c\\udfc0", "b": [1, [2, {"c": 3}]]}',
+    '{"a": {}, "b": [], "c": "", "d": [true, null, 1.5]}',
+    "﻿" + '{"bom": 1}',
+]
+
+INVALID_DOCUMENTS = [
+    "",
+    '{"a": 1',
+    '{"a": 1,}',
+    '{"a" 1}',
+    '{1: 2}',
+    '{"a": 1e}',
+    '{"a": tru}',
+    '{"a": 1x}',
+    '{"a": 1} trailing',
+    '{"a": 1}{"b": 2}',
+    "{} ]",
+]
+
+
+def _Chunks(document, split_points):
+    data = document.encode("utf-8")
+    points = [0, *sorted(split_points), len(data)]
+    return [data[start:end] for start, end in zip(points, points[1:])]
+
+
+def _Parse(chunks):
+    return dict(IterJsonObjectItems(chunks))
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_every_two_chunk_split_parses_like_json_loads(document):
+    expected = json.loads(document.lstrip("﻿"))
+    length = len(document.encode("utf-8"))
+    for split_point in range(length + 1):
+        assert _Parse(_Chunks(document, [split_point])) == expected
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_random_chunk_splits_parse_like_json_loads(document):
+    expected = json.loads(document.lstrip("﻿"))
+    length = len(document.encode("utf-8"))
+    rng = random.Random(document)
+    for _ in range(50):
+        split_points = [rng.randint(0, length) for _ in range(rng.randint(1, 8))]
+        assert _Parse(_Chunks(document, split_points)) == expected
+
+
+@pytest.mark.parametrize("document", INVALID_DOCUMENTS)
+def test_invalid_documents_are_rejected_however_they_are_split(document):
+    with pytest.raises(ValueError):
+        json.loads(document)
+
+    length = len(document.encode("utf-8"))
+    for split_point in range(length + 1):
+        with pytest.raises(ValueError):
+            _Parse(_Chunks(document, [split_point]))
+
+
+def test_a_top_level_array_is_rejected():
+    with pytest.raises(ValueError):
+        _Parse([b"[1, 2]"])
+
+
+def test_a_number_split_before_its_exponent_sign():
+    assert _Parse([b'{"a":1e', b"-05}"]) == {"a": 1e-05}
+
+
+def test_items_are_yielded_before_the_end_of_the_input():
+    def chunks():
+        yield b'{"first": 1, '
+        raise AssertionError("Read past the first item")
+
+    assert next(IterJsonObjectItems(chunks())) == ("first", 1)
+
+
+def test_json_and_jsonl_files_load_the_same_players(tmp_path):
+    players = {"One Player": {"Attributes": {"Block": 70}}, "Two Player": {"Vitals": {"Position": "C"}}}
+    json_path = tmp_path / "players.json"
+    json_path.write_text(json.dumps(players, indent=2), encoding="utf-8")
+    jsonl_path = tmp_path / "players.jsonl"
+    jsonl_path.write_text(
+        "\n".join(json.dumps({name: data}) for name, data in players.items()) + "\n",
+        encoding="utf-8",
+    )
+
+    assert LoadImportFile(str(json_path)).load_file() == players
+    assert LoadImportFile(str(jsonl_path)).load_file() == players
@@ -0,0 +1,50 @@
+import pytest
+
+from actions.memory_snapshot import MemorySnapshot
+
+# Where the readable memory of the stand-in reader starts
+BASE_ADDRESS = 0x20000000
+
+
+# A class to stand in for a pymem reader with unmapped memory past its buffer
+class BoundedMemory(object):
+    def __init__(self, size):
+        self.buffer = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        self.failed_reads = 0
+
+    def read_bytes(self, address, length):
+        start = address - BASE_ADDRESS
+        if start < 0 or start + length > len(self.buffer):
+            self.failed_reads += 1
+            raise OSError("Could not read memory")
+        return self.buffer[start : start + length]
+
+
+@pytest.mark.parametrize("readable", [0x448 * 300, 0x448 * 300 + 17, 0x1000, 0x3FFF])
+def test_prefetch_keeps_everything_before_unmapped_memory(readable):
+    memory = BoundedMemory(readable)
+    snapshot = MemorySnapshot(memory)
+
+    read = snapshot.prefetch(BASE_ADDRESS, 0x448 * 30000, chunk_size=0x4000)
+
+    assert read == readable
+    assert snapshot.region == memory.buffer
+
+
+def test_prefetch_stops_at_the_smallest_chunk():
+    memory = BoundedMemory(0x448 * 10 + 0x100)
+    snapshot = MemorySnapshot(memory)
+
+    read = snapshot.prefetch(BASE_ADDRESS, 0x448 * 100, chunk_size=0x4000, min_chunk_size=0x448)
+
+    # Only whole records are kept, the partly readable one is lost
+    assert read == 0x448 * 10
+    assert snapshot.region == memory.buffer[:read]
+    assert snapshot.read_bytes(BASE_ADDRESS + 0x448 * 9, 0x448) == memory.buffer[0x448 * 9 : read]
+
+
+def test_prefetch_of_unreadable_memory_is_empty():
+    snapshot = MemorySnapshot(BoundedMemory(0))
+
+    assert snapshot.prefetch(BASE_ADDRESS, 0x10000) == 0
+    assert snapshot.region == b""
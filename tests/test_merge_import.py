@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+pytest.importorskip("dribble")
+
+from actions.merge_import import MergedImport
+
+
+def _WriteImports(directory, *imports):
+    # One file per import, a .jsonl file for the last one
+    paths = []
+    for index, players in enumerate(imports):
+        if index == len(imports) - 1:
+            path = directory / f"import{index}.jsonl"
+            path.write_text("\n".join(json.dumps({name: data}) for name, data in players.items()))
+        else:
+            path = directory / f"import{index}.json"
+            path.write_text(json.dumps(players))
+        paths.append(str(path))
+    return paths
+
+
+def test_the_last_file_to_set_a_value_wins(offsets, tmp_path):
+    paths = _WriteImports(
+        tmp_path,
+        {"Brent George": {"Attributes": {"Block": 70, "Close Shot": 60}}},
+        {"Brent George": {"Attributes": {"Block": 80}, "Tendencies": {"Contested Jumper Mid": 50}}},
+        {"Brent George": {"Attributes": {"Block": 90}}},
+    )
+    merged = MergedImport(paths)
+
+    assert merged.load() == 1
+    assert list(merged.items()) == [
+        (
+            "Brent George",
+            {
+                "Attributes": {"Block": 90, "Close Shot": 60},
+                "Tendencies": {"Contested Jumper Mid": 50},
+            },
+        )
+    ]
+    # Block was replaced once in each of the first two files
+    assert merged.overridden == [1, 1, 0]
+
+
+def test_players_are_merged_by_normalized_name(offsets, tmp_path):
+    paths = _WriteImports(
+        tmp_path,
+        {"José Calderón": {"Attributes": {"Block": 70}}, "Luka Dončić": {"Attributes": {"Block": 75}}},
+        {"  jose   CALDERON ": {"Attributes": {"Close Shot": 65}}},
+    )
+    merged = MergedImport(paths)
+
+    assert merged.load() == 2
+    # The name is kept as it was first written, in the order players were first seen
+    assert list(merged.items()) == [
+        ("José Calderón", {"Attributes": {"Block": 70, "Close Shot": 65}}),
+        ("Luka Dončić", {"Attributes": {"Block": 75}}),
+    ]
+
+
+def test_a_file_setting_a_value_twice_does_not_override_itself(offsets):
+    merged = MergedImport(["a.json", "b.json"])
+    merged.merge(0, "Brent George", {"Attributes": {"Block": 70}})
+    merged.merge(0, "Brent George", {"Attributes": {"Block": 75}})
+
+    assert dict(merged.items())["Brent George"] == {"Attributes": {"Block": 75}}
+    assert merged.overridden == [0, 0]
+
+
+def test_source_logs_attribute_each_value_to_its_file(offsets):
+    merged = MergedImport(["configs/a.json", "configs/b.json", "api"])
+    merged.merge(
+        0,
+        "Brent George",
+        {"Team": {"Key": "T1"}, "Attributes": {"Block": 70, "Close Shot": 60, "Standing Dunk": 50}},
+    )
+    merged.merge(1, "Brent George", {"Attributes": {"Block": 80}})
+    merged.merge(2, "Jason Archer", {"Tendencies": {"Contested Jumper Mid": 50}})
+
+    assert merged.source_logs() == [
+        # The file with most of a player's values is counted, the others are listed
+        "Brent George: 2 values from a.json; b.json (Attributes Block)",
+        "Jason Archer: 1 values from api",
+        "a.json: 1 values replaced by later files.",
+        "b.json: 0 values replaced by later files.",
+        "api: 0 values replaced by later files.",
+    ]
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("dribble")
+
+from actions.build_player_list import BuildPlayerList
+from actions.player_snapshot import PlayerSnapshot, SavePlayerSnapshot
+from benchmarks.fake_memory import BuildFakeGame
+
+
+def test_snapshot_reads_back_the_player_list(offsets, tmp_path):
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+
+    SavePlayerSnapshot(exporter, tmp_path / "players.snap")
+
+    with PlayerSnapshot(tmp_path / "players.snap") as snapshot:
+        assert len(snapshot) == len(exporter.store)
+        exported = dict(snapshot.items())
+        for name, data in exporter.store.items():
+            # Every category, whether decoded column-wise or by BuildPlayer
+            assert exported[name] == data.to_dict()
+            assert snapshot.get(name) == data.to_dict()
+
+
+def test_sub_records_are_read_in_batches(offsets, tmp_path):
+    game = BuildFakeGame(2000)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+    game.memory.reset_counters()
+
+    SavePlayerSnapshot(exporter, tmp_path / "players.snap")
+
+    # Not one read per player per sub-record pointer
+    assert game.memory.counters()["reads"] < 100
@@ -0,0 +1,57 @@
+from array import array
+from types import SimpleNamespace
+
+from actions.player_store import PlayerStore
+
+
+def _Player(address, first_name, block, position="PG", team=None, **extra):
+    vitals = {"First Name": first_name, "Last Name": "Player", "Position": position}
+    vitals.update(extra)
+    return SimpleNamespace(
+        address=address,
+        team=team or {"Key": "T1", "Name": "Team"},
+        vitals=vitals,
+        attributes={"Block": block, "Dunk": 60},
+    )
+
+
+def test_integer_fields_are_kept_in_typed_arrays():
+    store = PlayerStore()
+    for index in range(3):
+        store.append(f"Player {index}", _Player(0x1000 + index, f"First{index}", 50 + index))
+
+    assert type(store.columns["Attributes"]["Block"]) is array
+    assert list(store.columns["Attributes"]["Block"]) == [50, 51, 52]
+    assert type(store.columns["Vitals"]["First Name"]) is list
+    assert store["Player 2"]["Attributes"]["Block"] == 52
+
+
+def test_a_value_that_does_not_fit_turns_the_column_into_a_list():
+    store = PlayerStore()
+    store.append("One", _Player(0x1000, "One", 50))
+    store.append("Two", _Player(0x2000, "Two", 1 << 64))
+    store.set_value("Attributes", "Dunk", 0, "High")
+
+    assert store.columns["Attributes"]["Block"] == [50, 1 << 64]
+    assert store["One"]["Attributes"]["Dunk"] == "High"
+    assert store["Two"]["Attributes"]["Dunk"] == 60
+
+
+def test_missing_fields_are_left_out_of_a_player():
+    store = PlayerStore()
+    store.append("One", _Player(0x1000, "One", 50))
+    store.append("Two", _Player(0x2000, "Two", 51, Height=80))
+    store.append("Three", _Player(0x3000, "Three", 52))
+
+    assert "Height" not in store["One"]["Vitals"]
+    assert store["Two"]["Vitals"]["Height"] == 80
+    assert "Height" not in store["Three"]["Vitals"]
+    assert store["Three"].to_dict()["Attributes"] == {"Block": 52, "Dunk": 60}
+
+
+def test_players_of_a_team_share_one_team_dictionary():
+    store = PlayerStore()
+    store.append("One", _Player(0x1000, "One", 50, team={"Key": "T1", "Name": "Team"}))
+    store.append("Two", _Player(0x2000, "Two", 51, team={"Key": "T1", "Name": "Team"}))
+
+    assert store["One"].team is store["Two"].team
@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("dribble")
+
+from actions.version_policy import VersionPolicy
+
+VERSIONS = {
+    "Luka Dončić on DAL": "0x1000",
+    "Luka Dončić on SLO": "0x2000",
+    "Luka Dončić on RMA": "0x3000",
+}
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {"policy": "newest"},
+        {"policy": "team"},
+        {"overrides": {"Luka Dončić": "last"}},
+        {"overrides": {"Luka Dončić": 3}},
+    ],
+)
+def test_invalid_policies_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        VersionPolicy(**arguments)
+
+
+def test_override_file_must_hold_an_object(tmp_path):
+    override_path = tmp_path / "overrides.json"
+    override_path.write_text("[]")
+    with pytest.raises(ValueError):
+        VersionPolicy.from_override_file("first", (), str(override_path))
+
+    override_path.write_text(json.dumps({"Luka Dončić": ["SLO"]}))
+    policy = VersionPolicy.from_override_file("first", (), str(override_path))
+    assert policy.select("Luka Dončić", VERSIONS) == ["0x2000"]
+
+
+def test_first_and_all_policies():
+    assert VersionPolicy("first").select("Luka Dončić", VERSIONS) == ["0x1000"]
+    assert VersionPolicy("all").select("Luka Dončić", VERSIONS) == ["0x1000", "0x2000", "0x3000"]
+    assert VersionPolicy("all").all_versions
+    assert not VersionPolicy("all", overrides={"Luka Dončić": "first"}).all_versions
+
+
+def test_team_policy_matches_keys_and_falls_back_to_the_first_version():
+    policy = VersionPolicy("team", ["slo", "RMA"])
+    assert policy.select("Luka Dončić", VERSIONS) == ["0x2000", "0x3000"]
+    assert VersionPolicy("team", ["BOS"]).select("Luka Dončić", VERSIONS) == ["0x1000"]
+
+
+def test_overrides_match_normalized_names_and_addresses():
+    policy = VersionPolicy("first", overrides={"  LUKA   doncic ": ["0X3000", "dal"]})
+    assert policy.select("Luka Dončić", VERSIONS) == ["0x1000", "0x3000"]
+    assert policy.select("Other Player", {"Other Player on DAL": "0x4000"}) == ["0x4000"]
+
+
+def test_key_covers_the_versions_only_when_teams_are_read():
+    traded = {"Luka Dončić": dict(zip(VERSIONS, ["0x2000", "0x1000", "0x3000"]))}
+    versions = {"Luka Dončić": VERSIONS}
+
+    first = VersionPolicy("first")
+    assert first.key(versions) == first.key(traded)
+
+    for policy in (
+        VersionPolicy("team", ["SLO"]),
+        VersionPolicy("first", overrides={"Luka Dončić": ["SLO"]}),
+    ):
+        assert policy.key(versions) != policy.key(traded)
+        assert policy.key(versions) == policy.key(dict(versions))
+
+
+def test_reimport_after_a_trade_writes_the_version_now_on_the_team(import_tree):
+    from actions.build_player_list import BuildPlayerList
+    from actions.import_sync_file import ImportSyncFile
+    from actions.offset_schema import GetSchema
+    from benchmarks.fake_memory import BuildFakeGame
+
+    schema = GetSchema()
+    game = BuildFakeGame(300)
+    exporter = BuildPlayerList(game)
+    exporter.run(quiet=True)
+
+    # A name with two versions on different teams
+    name, versions = next(
+        (name, versions) for name, versions in exporter.find_versions().items() if len(versions) > 1
+    )
+    first, second = (exporter.player_at(address) for address in list(versions.values())[:2])
+    first_team = first.team["Key"]
+
+    import_path = import_tree / "import.json"
+    import_path.write_text(json.dumps({name: {"Attributes": {"Block": 80}}}))
+
+    def import_block():
+        ImportSyncFile(
+            game,
+            exporter,
+            json.loads(import_path.read_text()),
+            source_path=str(import_path),
+            version_policy=VersionPolicy("team", [first_team]),
+        ).run()
+        exporter.refresh()
+
+    import_block()
+    assert exporter.player_at(first.address).attributes["Block"] == 80
+    assert exporter.player_at(second.address).attributes["Block"] != 80
+    assert len(os.listdir(import_tree / "configs" / "plans")) == 1
+
+    # Swap the teams of the two versions
+    team_offset = schema.base["Offset Player Team"]
+    first_pointer = game.memory.read_bytes(first.address + team_offset, 8)
+    second_pointer = game.memory.read_bytes(second.address + team_offset, 8)
+    game.memory.write_bytes(first.address + team_offset, second_pointer, 8)
+    game.memory.write_bytes(second.address + team_offset, first_pointer, 8)
+    exporter.refresh()
+
+    import_block()
+    assert exporter.player_at(second.address).team["Key"] == first_team
+    assert exporter.player_at(second.address).attributes["Block"] == 80
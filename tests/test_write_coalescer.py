@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dribble")
+
+from actions.offset_schema import FieldDescriptor
+from actions.write_coalescer import COALESCE_GAP, PlayerWriteTransaction, ShadowRecord
+
+# Where the player record of the stand-in memory starts
+PLAYER_ADDRESS = 0x1000
+RECORD_LENGTH = 0x40
+
+# Where the sub-record the player record points at starts
+SUB_RECORD_ADDRESS = 0x2000
+SUB_RECORD_DEREF = 0x30
+
+
+# A class to stand in for the game memory, counting the writes
+class BufferMemory(object):
+    def __init__(self, size=0x3000, drop_writes=False):
+        self.buffer = bytearray(size)
+        self.drop_writes = drop_writes
+        self.writes = []
+
+    def read_bytes(self, address, length):
+        return bytes(self.buffer[address : address + length])
+
+    def write_bytes(self, address, value, length):
+        self.writes.append((address, length))
+        if not self.drop_writes:
+            self.buffer[address : address + length] = value[:length]
+
+
+def _Field(name, offset, length, start_bit=0, deref=None, category="Badges"):
+    offset_info = {"name": name, "offset": hex(offset), "length": length, "startBit": start_bit}
+    if deref is not None:
+        offset_info["derefAddress"] = hex(deref)
+    return FieldDescriptor(category, offset_info)
+
+
+def _Transaction(memory):
+    memory.buffer[PLAYER_ADDRESS + SUB_RECORD_DEREF : PLAYER_ADDRESS + SUB_RECORD_DEREF + 8] = (
+        SUB_RECORD_ADDRESS.to_bytes(8, "little")
+    )
+    schema = SimpleNamespace(
+        player_length=RECORD_LENGTH, sub_record_lengths={SUB_RECORD_DEREF: 0x10}
+    )
+    return PlayerWriteTransaction(
+        SimpleNamespace(memory=memory), SimpleNamespace(address=PLAYER_ADDRESS), schema
+    )
+
+
+def test_bitfields_sharing_a_byte_are_merged_into_one_write():
+    memory = BufferMemory()
+    memory.buffer[PLAYER_ADDRESS + 2] = 0b11000000
+    low = _Field("Low", 2, 3)
+    middle = _Field("Middle", 2, 3, start_bit=3)
+
+    record = ShadowRecord(memory, PLAYER_ADDRESS, RECORD_LENGTH)
+    record.stage(low, 0b101)
+    record.stage(middle, 0b010)
+
+    assert record.flush() == 1
+    assert memory.writes == [(PLAYER_ADDRESS + 2, 1)]
+    # The top bits no field was staged to are kept
+    assert memory.buffer[PLAYER_ADDRESS + 2] == 0b11010101
+
+
+def test_multi_byte_fields_are_written_little_endian():
+    memory = BufferMemory()
+    memory.buffer[PLAYER_ADDRESS + 4 : PLAYER_ADDRESS + 8] = b"\x0f\x00\x00\xf0"
+    field = _Field("Wide", 4, 24, start_bit=4)
+
+    record = ShadowRecord(memory, PLAYER_ADDRESS, RECORD_LENGTH)
+    record.stage(field, 0xABCDEF)
+    record.flush()
+
+    assert memory.buffer[PLAYER_ADDRESS + 4 : PLAYER_ADDRESS + 8] == b"\xff\xde\xbc\xfa"
+    assert field.extract(memory.buffer, PLAYER_ADDRESS) == 0xABCDEF
+
+
+def test_dirty_ranges_are_merged_over_small_gaps():
+    memory = BufferMemory()
+    record = ShadowRecord(memory, PLAYER_ADDRESS, RECORD_LENGTH)
+    record.stage(_Field("First", 0, 8), 1)
+    record.stage(_Field("Near", COALESCE_GAP + 1, 8), 2)
+    record.stage(_Field("Far", RECORD_LENGTH - 1, 8), 3)
+
+    assert record.dirty_ranges() == [[0, COALESCE_GAP + 2], [RECORD_LENGTH - 1, RECORD_LENGTH]]
+    assert record.flush() == 2
+    assert memory.writes == [
+        (PLAYER_ADDRESS, COALESCE_GAP + 2),
+        (PLAYER_ADDRESS + RECORD_LENGTH - 1, 1),
+    ]
+
+    # Everything was written, so a second flush has nothing to do
+    assert record.flush() == 0
+
+
+def test_unchanged_values_are_not_written():
+    memory = BufferMemory()
+    memory.buffer[PLAYER_ADDRESS + 8] = 7
+    record = ShadowRecord(memory, PLAYER_ADDRESS, RECORD_LENGTH)
+    record.stage(_Field("Same", 8, 8), 7)
+
+    assert record.flush() == 0
+    assert memory.writes == []
+
+
+def test_holds_compares_against_memory_before_the_flush():
+    memory = BufferMemory()
+    memory.buffer[PLAYER_ADDRESS + 2] = 0b00101000
+    field = _Field("Middle", 2, 3, start_bit=3)
+    transaction = _Transaction(memory)
+
+    assert transaction.holds(field, 0b101)
+    assert not transaction.holds(field, 0b100)
+
+    # A staged value isn't in memory yet
+    transaction.stage(field, 0b100)
+    assert transaction.holds(field, 0b101)
+
+
+def test_sub_record_fields_are_written_through_the_record_pointer():
+    memory = BufferMemory()
+    player_field = _Field("Player", 0, 8)
+    sub_record_field = _Field("Sub", 4, 16, deref=SUB_RECORD_DEREF, category="Face")
+    transaction = _Transaction(memory)
+
+    transaction.stage(player_field, 9)
+    transaction.stage(sub_record_field, 0x1234)
+
+    assert transaction.flush() == 2
+    assert memory.buffer[SUB_RECORD_ADDRESS + 4 : SUB_RECORD_ADDRESS + 6] == b"\x34\x12"
+    assert memory.buffer[PLAYER_ADDRESS] == 9
+
+
+def test_verify_finds_the_values_memory_did_not_take():
+    field = _Field("Value", 3, 8)
+
+    memory = BufferMemory()
+    transaction = _Transaction(memory)
+    transaction.stage(field, 42)
+    transaction.flush()
+    assert transaction.verify() == []
+
+    memory = BufferMemory(drop_writes=True)
+    transaction = _Transaction(memory)
+    transaction.stage(field, 42)
+    transaction.flush()
+    assert transaction.verify() == [(field, 42, 0)]
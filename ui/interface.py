@@ -4,8 +4,9 @@ from rich.console import Console
 from rich.prompt import Prompt
 
 from actions.import_sync_file import ImportSyncFile
+from actions.instrumentation import Phase
 from actions.load_import_file import LoadImportFile
-from ui.prompts import PromptImportFile
+from ui.prompts import PromptImportFile, PromptSkipUnchangedValues, PromptVerifyWrites
 
 console = Console()
 
@@ -24,15 +25,24 @@ def run_cli(game, exporter):
             return
 
         try:
-            # Load the import file and get the data
+            # Open the import file, players are read as the importer goes
             import_handler = LoadImportFile(import_file_path)
-            import_data = import_handler.load_file()
-
-            # Run the exporter to initialize the player list, then run the importer with the loaded data
-            exporter.run()
-
-            # Run the importer with the loaded data
-            importer = ImportSyncFile(game, exporter, import_data)
+            import_data = import_handler.iter_file()
+
+            # Refresh the player list so the importer works on what's in game right now
+            with Phase("list_refresh"):
+                refresh_report = exporter.refresh()
+            console.print(
+                f"\n[cyan]Player list refreshed: {len(refresh_report['added'])} added, "
+                f"{len(refresh_report['removed'])} removed, {len(refresh_report['changed'])} changed.[/cyan]"
+            )
+
+            # Run the importer with the loaded data, optionally skipping values already in game
+            skip_unchanged = PromptSkipUnchangedValues()
+            verify = PromptVerifyWrites()
+            importer = ImportSyncFile(
+                game, exporter, import_data, skip_unchanged, import_file_path, verify=verify
+            )
             importer.run()
 
         except Exception as e:
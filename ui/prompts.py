@@ -1,11 +1,12 @@
 import json
 import os
-import requests
 
-from dribble.memory import GetOffsets
 from rich import print
 from InquirerPy import inquirer
 
+from actions.load_import_file import LoadImportFile
+from actions.offset_schema import GetSchema
+
 
 # A prompt that lets the user select a preset file
 def PromptPresetUsage():
@@ -54,13 +55,12 @@ def PromptPresetCreation(contents):
 # A prompt that lets the user select which items to export
 def PromptItemOptions():
     choices = {}
-    offsets = GetOffsets(None)
-    categories = [key for key in offsets.keys() if key != "Base"]
+    schema = GetSchema()
 
-    for category in categories:
+    for category in schema.category_names():
         print(f"\n[cyan]Choose items to export from {category}[/cyan]")
 
-        item_list = [item["name"] for item in offsets[category]]
+        item_list = [field.name for field in schema.categories[category]]
         selected_items = inquirer.checkbox(
             message="Select items to export:",
             choices=item_list,
@@ -78,7 +78,9 @@ def PromptImportFile(custom_title=None):
     import_dir = "configs/imports"
 
     try:
-        import_files = [f for f in os.listdir(import_dir) if f.endswith(".json")]
+        import_files = [
+            f for f in os.listdir(import_dir) if f.endswith((".json", ".jsonl"))
+        ]
         import_files.append("Import from Dribble API")
     except Exception as e:
         raise Exception(f"Error reading import directory: {e}")
@@ -111,25 +113,6 @@ def PromptPlayerVersions(versions):
     return selected
 
 
-# A prompt that lets the user choose the size of the player list
-def PromptPlayerListSize():
-    selected = inquirer.select(
-        message="Select a player list size:",
-        choices=[
-            ("500", 500),
-            ("2,500", 2500),
-            ("5,000", 5000),
-            ("10,000 (Default)", 10000),
-            ("20,000", 20000),
-            ("30,000", 30000),
-        ],
-    ).execute()
-
-    input("\nPress Enter to continue...")
-
-    return int(selected)
-
-
 # A prompt that lets the user choose if they want to specify which players to export
 def PromptExportPlayerSelection():
     selected = inquirer.select(
@@ -147,13 +130,10 @@ def PromptExportPlayerSelection():
 # A prompt that lets the user choose which specific players to export
 def PromptSpecificExportPlayers(import_file_path):
     try:
-        with open(import_file_path, "r") as f:
-            import_data = json.load(f)
+        player_names = [name for name, _ in LoadImportFile(import_file_path).iter_file()]
     except Exception:
         return []
 
-    player_names = list(import_data.keys())
-
     selected = inquirer.checkbox(
         message="Select players to export:",
         choices=player_names,
@@ -174,3 +154,29 @@ def PromptImportAllVersions():
     ).execute()
 
     return selected
+
+
+# A prompt that lets the user choose if values the game already holds should be skipped
+def PromptSkipUnchangedValues():
+    selected = inquirer.select(
+        message="Do you want to skip values that are already set in game?",
+        choices=[
+            ("Yes", True),
+            ("No", False),
+        ],
+    ).execute()
+
+    return selected
+
+
+# A prompt that lets the user choose if written values are read back & checked
+def PromptVerifyWrites():
+    selected = inquirer.select(
+        message="Do you want to read players back after writing to check the values stuck?",
+        choices=[
+            ("Yes", True),
+            ("No", False),
+        ],
+    ).execute()
+
+    return selected